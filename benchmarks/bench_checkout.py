@@ -0,0 +1,128 @@
+"""
+Benchmark de caja con varios cajeros simulados
+
+Cada cajero es un proceso con su propia conexión que usa CheckoutService
+igual que la ventana del POS: escanea productos por código, a veces aplica
+un descuento y cierra la venta (registro directo en la base). Los carritos
+siguen una distribución realista: la mayoría tiene pocas líneas, algunos
+son grandes, y unos pocos productos concentran la mayor parte de las ventas.
+
+Uso:
+    python benchmarks/bench_checkout.py [--cashiers 4] [--sales 500] [--products 5000] [--seed 1]
+
+Informa ventas por segundo y latencia p50/p99 del cierre de venta y del
+escaneo. Termina con código 1 si alguna venta falla.
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+
+from common import new_database, remove_temp_db
+from database import Database
+from pos_core import CheckoutService, OutOfStock
+
+
+def basket_size(rng):
+    # Mediana ~5 líneas, con cola larga hasta 150 (compras mayoristas)
+    return min(150, max(1, int(rng.lognormvariate(1.6, 0.9))))
+
+
+def pick_code(rng, products):
+    # Zipf aproximada: los primeros productos son los más vendidos
+    index = min(products - 1, int(rng.paretovariate(1.2)) - 1)
+    if rng.random() < 0.5:
+        index = rng.randrange(products)
+    return f"P{index + 1:07d}"
+
+
+def cashier(db_name, cashier_id, sales, products, seed, results):
+    rng = random.Random(seed * 1000 + cashier_id)
+    checkout_ms = []
+    scan_ms = []
+    errors = 0
+    try:
+        db = Database(db_name)
+        service = CheckoutService(db, usuario_id=1)
+        for _ in range(sales):
+            for _ in range(basket_size(rng)):
+                start = time.perf_counter()
+                try:
+                    service.add_by_code(pick_code(rng, products), rng.choice((1, 1, 1, 2, 3)))
+                except OutOfStock:
+                    pass
+                scan_ms.append((time.perf_counter() - start) * 1000)
+
+            if not service.cart:
+                continue
+            if rng.random() < 0.1:
+                service.apply_discount(round(service.cart.subtotal * 0.05, 2))
+
+            start = time.perf_counter()
+            try:
+                service.checkout()
+            except Exception:
+                errors += 1
+                service.clear()
+            checkout_ms.append((time.perf_counter() - start) * 1000)
+        db.close()
+    except Exception:
+        errors = sales
+    finally:
+        results.put((checkout_ms, scan_ms, errors))
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de caja con varios cajeros")
+    parser.add_argument('--cashiers', type=int, default=4)
+    parser.add_argument('--sales', type=int, default=500, help="ventas por cajero")
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    db, _ = new_database(args.products)
+    db_name = db.db_name
+    db.close()
+
+    try:
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=cashier,
+                                           args=(db_name, c, args.sales, args.products, args.seed, results))
+                   for c in range(args.cashiers)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        collected = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        checkout_ms = [ms for checkouts, _, _ in collected for ms in checkouts]
+        scan_ms = [ms for _, scans, _ in collected for ms in scans]
+        errors = sum(errors for _, _, errors in collected)
+        completed = len(checkout_ms) - errors
+
+        print(f"{args.cashiers} cajeros, {completed} ventas en {elapsed:.1f} s: "
+              f"{completed / elapsed:.0f} ventas/s, {errors} errores")
+        print(f"Cierre de venta: p50 {percentile(checkout_ms, 0.50):.2f} ms, "
+              f"p99 {percentile(checkout_ms, 0.99):.2f} ms")
+        print(f"Escaneo:         p50 {percentile(scan_ms, 0.50):.3f} ms, "
+              f"p99 {percentile(scan_ms, 0.99):.3f} ms ({len(scan_ms)} escaneos)")
+
+        if errors:
+            sys.exit(1)
+    finally:
+        remove_temp_db(db_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark de Database.create_sale
+
+Mide ventas por segundo para carritos de 1, 10 y 100 líneas y compara con
+la implementación anterior (una conexión y un commit por cada línea).
+
+Uso:
+    python benchmarks/bench_create_sale.py [--sales N] [--sizes 1,10,100]
+"""
+
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+
+from common import make_basket, new_database, remove_temp_db
+
+
+def legacy_create_sale(db_name, usuario_id, items, descuento=0, impuesto=0, sequence=0):
+    # Réplica del camino original: INSERT por línea y update_stock con su
+    # propia conexión y su propio commit por cada producto. El original abría
+    # esa segunda conexión con la primera aún escribiendo y quedaba bloqueado
+    # ("database is locked"); aquí se confirma antes para poder medirlo
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+    numero_factura = f"FAC-{datetime.now().strftime('%Y%m%d%H%M%S')}-{sequence}"
+    total_final = sum(item['subtotal'] for item in items) - descuento + impuesto
+    cursor.execute('''
+        INSERT INTO ventas (numero_factura, usuario_id, total, descuento, impuesto)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (numero_factura, usuario_id, total_final, descuento, impuesto))
+    venta_id = cursor.lastrowid
+    for item in items:
+        cursor.execute('''
+            INSERT INTO detalle_ventas (venta_id, producto_id, cantidad, precio_unitario, subtotal)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (venta_id, item['producto_id'], item['cantidad'], item['precio'], item['subtotal']))
+        conn.commit()
+        stock_conn = sqlite3.connect(db_name)
+        stock_conn.execute("UPDATE productos SET stock = stock - ? WHERE id = ?",
+                           (item['cantidad'], item['producto_id']))
+        stock_conn.execute('''
+            INSERT INTO movimientos_inventario (producto_id, tipo_movimiento, cantidad, motivo, usuario_id)
+            VALUES (?, 'salida', ?, ?, ?)
+        ''', (item['producto_id'], item['cantidad'], f"Venta {numero_factura}", usuario_id))
+        stock_conn.commit()
+        stock_conn.close()
+    conn.commit()
+    conn.close()
+
+
+def run(sales, size, legacy=False):
+    db, product_ids = new_database(max(size, 1000))
+    baskets = [make_basket(product_ids, size, offset=i * size) for i in range(sales)]
+
+    try:
+        start = time.perf_counter()
+        for i, basket in enumerate(baskets):
+            if legacy:
+                legacy_create_sale(db.db_name, 1, basket, sequence=i)
+            else:
+                db.create_sale(1, basket)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+        remove_temp_db(db.db_name)
+    return sales / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de create_sale")
+    parser.add_argument('--sales', type=int, default=200, help="ventas por medición")
+    parser.add_argument('--sizes', default="1,10,100", help="líneas por carrito")
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help="no medir la implementación anterior")
+    args = parser.parse_args()
+
+    print(f"{'líneas':>8} {'ventas/s':>12} {'anterior':>12} {'mejora':>8}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        rate = run(args.sales, size)
+        if args.skip_legacy:
+            print(f"{size:>8} {rate:>12.1f}")
+            continue
+        # La implementación anterior con carritos grandes es muy lenta
+        legacy_rate = run(max(args.sales // max(size // 10, 1), 5), size, legacy=True)
+        print(f"{size:>8} {rate:>12.1f} {legacy_rate:>12.1f} {rate / legacy_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
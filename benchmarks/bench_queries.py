@@ -0,0 +1,202 @@
+"""
+Benchmark de todas las rutas de consulta a distintos tamaños de base
+
+Para cada tamaño (productos x ventas) genera con datagen.py una base
+sintética (o reutiliza la ya generada con los mismos parámetros), la copia a
+un directorio temporal y mide:
+
+  - get_products: listado completo (recarga el catálogo) y búsquedas con
+    FTS (3+ caracteres) y con LIKE (términos cortos)
+  - get_product_by_code: desde el catálogo en memoria y un código que no está
+  - create_sale y update_stock
+  - las consultas de los cinco reportes: ventas del día, ventas del período,
+    productos más vendidos, stock bajo y movimientos (primera página y totales)
+
+Los resultados (mínimo, mediana, p95 y promedio en ms por ruta y tamaño) se
+escriben en JSON. Con --baseline se comparan las medianas contra un JSON
+anterior y el script termina con código 1 si alguna ruta es más lenta que
+la tolerancia.
+
+Uso:
+    python benchmarks/bench_queries.py [--sizes 1000x10000,100000x100000] [--seed 1]
+        [--repeat 20] [--output bench_queries.json] [--baseline anterior.json] [--tolerance 1.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from datagen import cached_database
+from database import Database
+import reports
+
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "pos_bench_data")
+# Tiempo máximo de medición por ruta; siempre se hacen al menos MIN_RUNS
+BUDGET_SECONDS = 5
+MIN_RUNS = 3
+# Diferencias menores se consideran ruido al comparar con --baseline
+NOISE_MS = 0.05
+
+
+def measure(func, repeat):
+    times = []
+    deadline = time.perf_counter() + BUDGET_SECONDS
+    while len(times) < repeat and (len(times) < MIN_RUNS or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        'runs': len(times),
+        'min_ms': times[0],
+        'median_ms': times[len(times) // 2],
+        'p95_ms': times[min(len(times) - 1, int(len(times) * 0.95))],
+        'mean_ms': sum(times) / len(times),
+    }
+
+
+def query_paths(db):
+    # (nombre, función) de cada ruta; las de escritura modifican la copia
+    today = datetime.now().date()
+    week_ago = today - timedelta(days=7)
+    month_ago = today - timedelta(days=30)
+
+    db.get_products()
+    products = db.catalog.ordered_ids()
+    product = db.get_product_by_id(products[len(products) // 2])
+    basket = [db.get_product_by_id(products[i * len(products) // 4]) for i in range(4)]
+    items = [{'producto_id': p.id, 'nombre': p.nombre, 'precio': p.precio_venta,
+              'cantidad': 1, 'subtotal': p.precio_venta} for p in basket]
+
+    def daily_sales():
+        reports.sales_pager(db, today).next_page()
+        db.get_sales_summary(today)
+
+    def period_sales():
+        reports.sales_pager(db, week_ago, today).next_page()
+        db.get_sales_summary(week_ago, today)
+
+    def movements():
+        reports.movements_pager(db, week_ago, today, "todos").next_page()
+        reports.movement_totals(db, week_ago, today, "todos")
+
+    return [
+        ('get_products', db.get_products),
+        ('get_products_fts', lambda: db.get_products("arroz")),
+        ('get_products_like', lambda: db.get_products("ar")),
+        ('get_product_by_code', lambda: db.get_product_by_code(product.codigo)),
+        ('get_product_by_code_missing', lambda: db.get_product_by_code("no-existe")),
+        ('create_sale', lambda: db.create_sale(1, items)),
+        ('update_stock', lambda: db.update_stock(product.id, 1, "entrada", 1, "Benchmark")),
+        ('report_daily_sales', daily_sales),
+        ('report_period_sales', period_sales),
+        ('report_top_products', lambda: db.get_top_products(month_ago, today, 10)),
+        ('report_low_stock', lambda: reports.low_stock_products(db)),
+        ('report_movements', movements),
+    ]
+
+
+def run_size(path, repeat):
+    workdir = tempfile.mkdtemp(prefix="pos_bench_")
+    copy = os.path.join(workdir, os.path.basename(path))
+    shutil.copyfile(path, copy)
+    db = Database(copy)
+    try:
+        return {name: measure(func, repeat) for name, func in query_paths(db)}
+    finally:
+        db.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline, tolerance):
+    # Relación mediana actual / anterior por ruta; True si alguna supera la tolerancia
+    previous = {(r['products'], r['sales'], r['path']): r for r in baseline['results']}
+    regressed = False
+    print(f"\n{'tamaño':>16} {'ruta':<28} {'antes ms':>10} {'ahora ms':>10} {'relación':>9}")
+    for result in results:
+        old = previous.get((result['products'], result['sales'], result['path']))
+        if old is None:
+            continue
+        ratio = result['median_ms'] / old['median_ms'] if old['median_ms'] > 0 else 1.0
+        flag = ""
+        if ratio > tolerance and result['median_ms'] - old['median_ms'] > NOISE_MS:
+            regressed = True
+            flag = "  REGRESIÓN"
+        print(f"{result['products']:>7}x{result['sales']:<8} {result['path']:<28} "
+              f"{old['median_ms']:>10.2f} {result['median_ms']:>10.2f} {ratio:>8.2f}x{flag}")
+    return regressed
+
+
+def parse_sizes(text):
+    sizes = []
+    for size in text.split(','):
+        products, sales = size.lower().split('x')
+        sizes.append((int(products), int(sales)))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de rutas de consulta por tamaño de base")
+    parser.add_argument('--sizes', default="1000x10000,100000x100000",
+                        help="tamaños productosxventas separados por coma")
+    parser.add_argument('--seed', type=int, default=1, help="semilla de los datos")
+    parser.add_argument('--days', type=int, default=365, help="días de historia de ventas")
+    parser.add_argument('--repeat', type=int, default=20, help="mediciones por ruta")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="directorio de bases generadas")
+    parser.add_argument('--output', default="bench_queries.json", help="archivo JSON de resultados")
+    parser.add_argument('--baseline', help="JSON de una corrida anterior para comparar")
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help="relación máxima aceptada contra la corrida anterior")
+    args = parser.parse_args()
+
+    results = []
+    for products, sales in parse_sizes(args.sizes):
+        def progress(done):
+            print(f"\rgenerando {products}x{sales}: {done}/{sales} ventas", end="", flush=True)
+
+        path = cached_database(args.data_dir, products, sales, args.seed, args.days, progress)
+        print(f"\n{products} productos, {sales} ventas")
+        for name, stats in run_size(path, args.repeat).items():
+            print(f"  {name:<28} mediana {stats['median_ms']:>9.2f} ms  p95 {stats['p95_ms']:>9.2f} ms")
+            results.append({'products': products, 'sales': sales, 'path': name, **stats})
+
+    report = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'days': args.days,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
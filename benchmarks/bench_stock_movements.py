@@ -0,0 +1,75 @@
+"""
+Benchmark de movimientos de stock en lote
+
+Compara registrar una recepción de N líneas con apply_stock_movements (una
+transacción, actualización de stock en una sola sentencia) contra el camino
+por producto (una llamada a update_stock y un commit por línea).
+
+Uso:
+    python benchmarks/bench_stock_movements.py [--sizes 10,100,800] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+
+from common import new_database, remove_temp_db
+
+
+PRODUCTS = 1000
+
+
+def receiving(product_ids, size):
+    return [(product_ids[i % len(product_ids)], "entrada", 1 + i % 12, "Recepción benchmark")
+            for i in range(size)]
+
+
+def run(movements, repeat, batch):
+    db, _ = new_database(PRODUCTS)
+    try:
+        before = dict(db.get_connection().execute("SELECT id, stock FROM productos"))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            if batch:
+                db.apply_stock_movements(movements, 1)
+            else:
+                for producto_id, tipo, cantidad, motivo in movements:
+                    db.update_stock(producto_id, cantidad, tipo, 1, motivo)
+        elapsed = (time.perf_counter() - start) / repeat
+
+        # Ambos caminos deben dejar el mismo stock y los mismos movimientos
+        conn = db.get_connection()
+        expected = dict(before)
+        for producto_id, _, cantidad, _ in movements:
+            expected[producto_id] += cantidad * repeat
+        after = dict(conn.execute("SELECT id, stock FROM productos"))
+        count = conn.execute("SELECT COUNT(*) FROM movimientos_inventario").fetchone()[0]
+        return elapsed, after == expected and count == len(movements) * repeat
+    finally:
+        db.close()
+        remove_temp_db(db.db_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de movimientos de stock")
+    parser.add_argument('--sizes', default="10,100,800", help="líneas por recepción")
+    parser.add_argument('--repeat', type=int, default=5, help="recepciones por medición")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'líneas':>8} {'lote ms':>10} {'por línea ms':>14} {'mejora':>8}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        movements = receiving(list(range(1, PRODUCTS + 1)), size)
+        batch_seconds, batch_ok = run(movements, args.repeat, batch=True)
+        item_seconds, item_ok = run(movements, args.repeat, batch=False)
+        failed = failed or not (batch_ok and item_ok)
+        print(f"{size:>8} {batch_seconds * 1000:>10.1f} {item_seconds * 1000:>14.1f} "
+              f"{item_seconds / batch_seconds:>7.1f}x")
+
+    if failed:
+        print("FALLO: el stock o los movimientos no coinciden")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Utilidades compartidas por los scripts de benchmark
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+# Permitir importar los módulos del sistema desde benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+
+def temp_db_path(name="bench.db"):
+    """Ruta a una base de datos nueva en un directorio temporal"""
+    return os.path.join(tempfile.mkdtemp(prefix="pos_bench_"), name)
+
+
+def remove_temp_db(db_name):
+    """Borra el directorio temporal de una base creada con temp_db_path"""
+    shutil.rmtree(os.path.dirname(db_name), ignore_errors=True)
+
+
+def seed_products(db, count, stock=1_000_000_000):
+    """Crea `count` productos con stock suficiente para el benchmark"""
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO productos (codigo, nombre, descripcion, categoria_id,
+                                   precio_venta, precio_compra, stock, stock_minimo)
+            VALUES (?, ?, ?, 1, ?, ?, ?, 5)
+        ''', ((f"P{i:07d}", f"Producto {i}", f"Descripción del producto {i}",
+               1.0 + (i % 500) / 10, 0.5 + (i % 500) / 20, stock)
+              for i in range(1, count + 1)))
+        return [row[0] for row in conn.execute("SELECT id FROM productos ORDER BY id")]
+
+
+def make_basket(product_ids, size, offset=0):
+    """Carrito de `size` líneas distintas con el formato que usa POSMain"""
+    items = []
+    for i in range(size):
+        producto_id = product_ids[(offset + i) % len(product_ids)]
+        precio = 1.0 + (producto_id % 500) / 10
+        items.append({
+            'producto_id': producto_id,
+            'nombre': f"Producto {producto_id}",
+            'precio': precio,
+            'cantidad': 1,
+            'subtotal': precio
+        })
+    return items
+
+
+def new_database(count=1000, name="bench.db"):
+    """Base de datos temporal con el esquema actual y `count` productos"""
+    db = Database(temp_db_path(name))
+    product_ids = seed_products(db, count)
+    return db, product_ids
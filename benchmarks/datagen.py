@@ -0,0 +1,218 @@
+"""
+Generador de bases de datos sintéticas para los benchmarks
+
+Crea una base con el esquema actual (Database) y la llena con productos,
+cajeros, ventas con sus detalles y movimientos, y recepciones de mercadería
+repartidas en los últimos `days` días hasta hoy. Con la misma semilla y los
+mismos tamaños el contenido es siempre el mismo (las fechas son relativas al
+día de generación), así que dos versiones del sistema se pueden medir sobre
+datos idénticos.
+
+  - Los productos se venden con popularidad tipo Zipf (pocos productos
+    concentran la mayoría de las ventas) y los carritos tienen tamaño
+    log-normal, como en bench_checkout.py.
+  - Las ventas avanzan en el tiempo con el id, igual que en el sistema real.
+  - El stock final se sortea por producto; una parte queda por debajo del
+    mínimo para que el reporte de stock bajo tenga filas.
+  - Los acumulados diarios se recalculan al final.
+
+Uso:
+    python benchmarks/datagen.py salida.db --products 100000 --sales 1000000 [--seed 1] [--days 365]
+"""
+
+import argparse
+import hashlib
+import itertools
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import common  # noqa: F401  (permite importar los módulos del sistema)
+from database import Database, rebuild_daily_sales, rebuild_daily_product_sales
+
+
+CASHIERS = 8
+# Ventas por transacción durante la carga
+SALES_PER_BATCH = 10_000
+# Una recepción de mercadería cada tantas ventas
+RECEIVING_EVERY = 200
+RECEIVING_LINES = 20
+ZIPF_EXPONENT = 1.1
+
+CATEGORIES = ("Almacén", "Bebidas", "Lácteos", "Limpieza", "Perfumería", "Panadería",
+              "Congelados", "Librería", "Ferretería", "Mascotas")
+KINDS = ("Arroz", "Aceite", "Leche", "Yerba", "Café", "Azúcar", "Harina", "Fideos", "Galletitas",
+         "Jabón", "Detergente", "Shampoo", "Gaseosa", "Agua", "Jugo", "Queso", "Yogur", "Pan",
+         "Lápiz", "Cuaderno", "Tornillos", "Pilas", "Alimento", "Vino", "Cerveza", "Atún")
+BRANDS = ("La Serenísima", "Marolio", "Arcor", "Ledesma", "Molinos", "Cañuelas", "Sancor",
+          "Bagley", "Natura", "Ala", "Magistral", "Dove", "Manaos", "Villavicencio", "Quilmes",
+          "Taragüí", "Playadito", "Gallo", "Lucchetti", "Rapiditas")
+SIZES = ("100 g", "250 g", "500 g", "1 kg", "5 kg", "500 ml", "1 l", "1,5 l", "2,25 l",
+         "x 6", "x 12", "chico", "mediano", "grande", "familiar")
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def product_rows(rng, count, category_ids):
+    for i in range(1, count + 1):
+        nombre = f"{rng.choice(KINDS)} {rng.choice(BRANDS)} {rng.choice(SIZES)}"
+        precio_compra = round(min(rng.lognormvariate(1.5, 1.0), 500.0) + 0.1, 2)
+        precio_venta = round(precio_compra * rng.uniform(1.2, 1.6), 2)
+        stock_minimo = rng.randint(0, 20)
+        # ~5 % de los productos por debajo del mínimo (parte sin stock)
+        if rng.random() < 0.05:
+            stock = rng.randint(0, stock_minimo)
+        else:
+            stock = rng.randint(stock_minimo + 1, 500)
+        activo = 0 if rng.random() < 0.02 else 1
+        yield (f"779{i:010d}", nombre, f"{nombre} - artículo {i}", rng.choice(category_ids),
+               precio_venta, precio_compra, stock, stock_minimo, activo)
+
+
+def popularity(rng, products):
+    # (ids, pesos acumulados) con la popularidad Zipf repartida al azar
+    ids = [row[0] for row in products]
+    rng.shuffle(ids)
+    weights = list(itertools.accumulate(1 / rank ** ZIPF_EXPONENT for rank in range(1, len(ids) + 1)))
+    return ids, weights
+
+
+def generate(path, products, sales, seed=1, days=365, progress=None):
+    # progress(ventas_generadas) tras cada lote de ventas
+    if os.path.exists(path):
+        raise FileExistsError(path)
+    rng = random.Random(seed)
+
+    db = Database(path)
+    conn = db.get_connection()
+    # La base es descartable: sin fsync durante la carga
+    conn.execute("PRAGMA synchronous = OFF")
+
+    with db.transaction() as conn:
+        conn.executemany("INSERT OR IGNORE INTO categorias (nombre) VALUES (?)",
+                         ((nombre,) for nombre in CATEGORIES))
+        category_ids = [row[0] for row in conn.execute("SELECT id FROM categorias ORDER BY id")]
+
+        password = hashlib.sha256("cajero123".encode()).hexdigest()
+        conn.executemany('''
+            INSERT INTO usuarios (username, password, nombre, rol) VALUES (?, ?, ?, 'cajero')
+        ''', ((f"cajero{i}", password, f"Cajero {i}") for i in range(1, CASHIERS + 1)))
+        cashier_ids = [row[0] for row in conn.execute("SELECT id FROM usuarios WHERE rol = 'cajero'")]
+        admin_id = conn.execute("SELECT id FROM usuarios WHERE rol = 'admin'").fetchone()[0]
+
+        conn.executemany('''
+            INSERT INTO productos (codigo, nombre, descripcion, categoria_id, precio_venta,
+                                   precio_compra, stock, stock_minimo, activo)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', product_rows(rng, products, category_ids))
+        catalog = conn.execute("SELECT id, precio_venta FROM productos WHERE activo = 1 ORDER BY id").fetchall()
+
+    prices = dict(catalog)
+    ids, weights = popularity(rng, catalog)
+
+    end = datetime.now().replace(microsecond=0)
+    start = end - timedelta(days=days)
+    step = (end - start) / max(sales, 1)
+
+    receiving = 0
+    for first in range(0, sales, SALES_PER_BATCH):
+        sale_rows = []
+        detail_rows = []
+        movement_rows = []
+        for number in range(first + 1, min(first + SALES_PER_BATCH, sales) + 1):
+            fecha_dt = start + step * number
+            fecha = fecha_dt.strftime(DATE_FORMAT)
+            numero_factura = f"FAC-{fecha_dt.strftime('%Y%m%d')}-{number:08d}"
+            usuario_id = rng.choice(cashier_ids)
+
+            size = max(1, min(40, int(rng.lognormvariate(1.1, 0.7))))
+            basket = dict.fromkeys(rng.choices(ids, cum_weights=weights, k=size))
+            total = 0.0
+            for producto_id in basket:
+                cantidad = rng.choice((1, 1, 1, 1, 2, 2, 3, 5))
+                precio = prices[producto_id]
+                subtotal = cantidad * precio
+                total += subtotal
+                detail_rows.append((number, producto_id, cantidad, precio, subtotal))
+                movement_rows.append((producto_id, 'salida', cantidad, f"Venta {numero_factura}",
+                                      usuario_id, fecha))
+
+            descuento = round(total * rng.uniform(0.05, 0.1), 2) if rng.random() < 0.1 else 0
+            sale_rows.append((number, numero_factura, usuario_id, total - descuento, descuento, fecha))
+
+            if number % RECEIVING_EVERY == 0:
+                receiving += 1
+                for producto_id in dict.fromkeys(rng.choices(ids, cum_weights=weights, k=RECEIVING_LINES)):
+                    movement_rows.append((producto_id, 'entrada', rng.randint(12, 120),
+                                          f"Recepción REM-{receiving:06d}", admin_id, fecha))
+
+        with db.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO ventas (id, numero_factura, usuario_id, total, descuento, impuesto, fecha)
+                VALUES (?, ?, ?, ?, ?, 0, ?)
+            ''', sale_rows)
+            conn.executemany('''
+                INSERT INTO detalle_ventas (venta_id, producto_id, cantidad, precio_unitario, subtotal)
+                VALUES (?, ?, ?, ?, ?)
+            ''', detail_rows)
+            conn.executemany('''
+                INSERT INTO movimientos_inventario (producto_id, tipo_movimiento, cantidad, motivo,
+                                                    usuario_id, fecha)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', movement_rows)
+        if progress:
+            progress(min(first + SALES_PER_BATCH, sales))
+
+    with db.transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE secuencias SET valor = ? WHERE nombre = 'factura'", (sales,))
+        rebuild_daily_sales(cursor)
+        rebuild_daily_product_sales(cursor)
+
+    db.close()
+    return path
+
+
+def cached_database(directory, products, sales, seed=1, days=365, progress=None):
+    # Reutiliza la base generada hoy con los mismos parámetros si ya existe
+    # (las fechas de las ventas dependen del día de generación). Se genera
+    # con otro nombre y se renombra al terminar, así una carga interrumpida
+    # nunca queda como base válida
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"pos_{products}p_{sales}v_{days}d_s{seed}_"
+                                   f"{datetime.now().strftime('%Y%m%d')}.db")
+    if not os.path.exists(path):
+        partial = path + ".parcial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        generate(partial, products, sales, seed, days, progress)
+        os.replace(partial, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una base de datos sintética del POS")
+    parser.add_argument('salida', help="archivo de base de datos a crear (no debe existir)")
+    parser.add_argument('--products', type=int, default=1000, help="cantidad de productos")
+    parser.add_argument('--sales', type=int, default=10_000, help="cantidad de ventas")
+    parser.add_argument('--seed', type=int, default=1, help="semilla del generador")
+    parser.add_argument('--days', type=int, default=365, help="días de historia")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def progress(done):
+        print(f"\r{done}/{args.sales} ventas", end="", flush=True)
+
+    try:
+        generate(args.salida, args.products, args.sales, args.seed, args.days, progress)
+    except FileExistsError:
+        print(f"{args.salida} ya existe", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nBase generada en {time.perf_counter() - start:.1f} s: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Presupuesto de tiempo de importación del arranque
+
+Ejecuta `python -X importtime` sobre los módulos del arranque en un proceso
+limpio y falla si:
+  - el arranque importa módulos que deben cargarse bajo demanda
+    (gestión de productos, usuarios y reportes), o
+  - el tiempo acumulado de importación supera el presupuesto.
+
+Uso:
+    python benchmarks/import_budget.py [--budget-ms 150] [--runs 5]
+
+Termina con código 1 si se excede el presupuesto.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulo de arranque -> módulos que no debe arrastrar al importarse
+LAZY_MODULES = {
+    'main': ('pos_main', 'inventory_management', 'reports'),
+    'pos_main': ('inventory_management', 'reports'),
+}
+
+
+def import_times(module):
+    # Devuelve {módulo: microsegundos acumulados} de una importación en frío
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # "import time:  self [us] | cumulative | nombre"
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Presupuesto de importación del arranque")
+    parser.add_argument('--budget-ms', type=float, default=150.0,
+                        help="tiempo máximo de importación de main (mediana)")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    failures = []
+    for module, forbidden in LAZY_MODULES.items():
+        loaded = import_times(module)
+        eager = [name for name in forbidden if name in loaded]
+        if eager:
+            failures.append(f"{module} importa al arrancar: {', '.join(eager)}")
+
+    samples = sorted(import_times('main')['main'] / 1000 for _ in range(args.runs))
+    median = samples[len(samples) // 2]
+    print(f"Importación de main: mediana {median:.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+    if median > args.budget_ms:
+        failures.append(f"importación de main: {median:.1f} ms > {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FALLO: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Prueba de estrés del generador de números de factura
+
+Lanza varias terminales simuladas (procesos) que registran ventas contra la
+misma base de datos tan rápido como pueden y verifica que no haya números de
+factura repetidos ni ventas perdidas. También mide la velocidad del
+generador por sí solo.
+
+Uso:
+    python benchmarks/stress_invoices.py [--terminals 4] [--sales 2000]
+
+Termina con código 1 si encuentra alguna colisión o alguna venta falla.
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from collections import Counter
+
+from common import make_basket, new_database, remove_temp_db, temp_db_path
+from database import Database
+
+
+def terminal(terminal_id, db_name, sales, offset, product_ids, results):
+    # Errores por tipo de excepción, para informar qué falló en cada terminal
+    errors = Counter()
+    try:
+        db = Database(db_name)
+        for i in range(sales):
+            try:
+                db.create_sale(1, make_basket(product_ids, 1, offset=offset + i))
+            except Exception as e:
+                errors[type(e).__name__] += 1
+        db.close()
+    except Exception as e:
+        errors[type(e).__name__] += sales - sum(errors.values())
+    finally:
+        results.put((terminal_id, errors))
+
+
+def stress_sales(terminals, sales):
+    db, product_ids = new_database(1000)
+    db_name = db.db_name
+    db.close()
+
+    try:
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=terminal,
+                                           args=(t, db_name, sales, t * sales, product_ids, results))
+                   for t in range(terminals)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        errors = dict(results.get() for _ in workers)
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        db = Database(db_name)
+        total, distinct = db.get_connection().execute(
+            "SELECT COUNT(*), COUNT(DISTINCT numero_factura) FROM ventas").fetchone()
+        db.close()
+        return total, distinct, errors, total / elapsed
+    finally:
+        remove_temp_db(db_name)
+
+
+def generator_rate(count):
+    # Números reservados por segundo, cada uno en su propia transacción
+    db = Database(temp_db_path())
+    try:
+        numbers = set()
+        start = time.perf_counter()
+        for _ in range(count):
+            with db.transaction() as conn:
+                numbers.add(db.next_invoice_number(conn.cursor()))
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+        remove_temp_db(db.db_name)
+    return len(numbers), count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estrés del generador de facturas")
+    parser.add_argument('--terminals', type=int, default=4)
+    parser.add_argument('--sales', type=int, default=2000, help="ventas por terminal")
+    args = parser.parse_args()
+
+    unique, rate = generator_rate(args.sales * args.terminals)
+    print(f"Generador: {unique} números únicos de {args.sales * args.terminals}, {rate:.0f} números/s")
+
+    total, distinct, errors, sales_rate = stress_sales(args.terminals, args.sales)
+    expected = args.terminals * args.sales
+    failed = sum(sum(counts.values()) for counts in errors.values())
+    print(f"Ventas: {total}/{expected} registradas, {distinct} facturas distintas, "
+          f"{failed} errores, {sales_rate:.0f} ventas/s con {args.terminals} terminales")
+    for terminal_id, counts in sorted(errors.items()):
+        if counts:
+            detail = ", ".join(f"{name} x{count}" for name, count in counts.most_common())
+            print(f"  terminal {terminal_id}: {detail}")
+
+    if unique != args.sales * args.terminals or distinct != total or total + failed != expected:
+        print("COLISIÓN DE NÚMEROS DE FACTURA")
+        sys.exit(1)
+    if failed:
+        print("VENTAS CON ERROR")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Prueba de replicación de muchos locales hacia la base central
+
+Levanta replication_server.py en este proceso y lanza N locales (procesos),
+cada uno con su propia base y su ReplicationShipper, que venden y registran
+recepciones mientras envían el registro de replicación. La central arranca
+caída (los locales venden sin conexión), se levanta, se corta a mitad de la
+prueba y se vuelve a levantar sobre la misma base. Al terminar verifica,
+por local, que la central tenga exactamente las ventas, líneas y
+movimientos de la base del local (sin duplicados ni faltantes) y que el
+número confirmado sea el último registro del local.
+
+Uso:
+    python benchmarks/stress_replication.py [--terminals 30] [--sales 200] [--outage 3] [--seed 1]
+
+Termina con código 1 si encuentra alguna inconsistencia.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+from bench_checkout import basket_size, pick_code
+from common import remove_temp_db, seed_products, temp_db_path
+from database import Database
+from pos_core import CheckoutService, OutOfStock
+from replication import ReplicationShipper
+from replication_server import CentralStore, create_server
+
+
+PRODUCTS = 500
+RECEIVING_EVERY = 25
+# Tiempo máximo para que un local termine de enviar lo pendiente (segundos)
+DRAIN_TIMEOUT = 120
+
+
+def local_store(db_name, url, sales, seed, terminal_id, results):
+    rng = random.Random(seed * 1000 + terminal_id)
+    errors = []
+    shipped = 0
+    try:
+        db = Database(db_name)
+        shipper = ReplicationShipper(db, url, interval=0.2)
+        # Espera corta entre reintentos para que la prueba no dure de más
+        shipper.MAX_RETRY_DELAY = 1.0
+        shipper.start()
+
+        service = CheckoutService(db, usuario_id=1)
+        for number in range(1, sales + 1):
+            for _ in range(min(basket_size(rng), 20)):
+                try:
+                    service.add_by_code(pick_code(rng, PRODUCTS), rng.choice((1, 1, 2)))
+                except OutOfStock:
+                    pass
+            if service.cart:
+                service.checkout()
+            if number % RECEIVING_EVERY == 0:
+                db.apply_stock_movements([(rng.randint(1, PRODUCTS), "entrada", rng.randint(10, 100),
+                                           f"Recepción L{terminal_id}-{number}") for _ in range(5)], 1)
+            # Ritmo de una caja ocupada, para que la prueba cruce los cortes
+            time.sleep(rng.uniform(0, 0.02))
+
+        deadline = time.monotonic() + DRAIN_TIMEOUT
+        while shipper.pending() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if shipper.pending():
+            errors.append(f"{shipper.pending()} registros sin enviar ({shipper.last_error})")
+        shipper.stop()
+        shipped = shipper.shipped
+        db.close()
+    except Exception as e:
+        errors.append(f"local {terminal_id}: {e}")
+    finally:
+        results.put((terminal_id, shipped, errors))
+
+
+def new_local(terminal_id):
+    db = Database(temp_db_path(f"local{terminal_id}.db"))
+    seed_products(db, PRODUCTS, stock=1_000_000)
+    # Registrar desde la primera venta, antes de que arranque el enviador
+    db.enable_replication()
+    db_name = db.db_name
+    db.close()
+    return db_name
+
+
+def verify(central, db_names):
+    problems = []
+    conn = central.conn
+    for db_name in db_names:
+        with Database(db_name) as db:
+            local = db.get_connection()
+            nodo = local.execute("SELECT valor FROM configuracion WHERE clave = 'nodo'").fetchone()[0]
+            expected = {
+                'ventas': local.execute("SELECT COUNT(*), COALESCE(SUM(total), 0) FROM ventas").fetchone(),
+                'detalle': local.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(cantidad), 0) FROM detalle_ventas").fetchone(),
+                'movimientos': local.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(cantidad), 0) FROM movimientos_inventario").fetchone(),
+            }
+            last_seq = local.execute("SELECT COALESCE(MAX(seq), 0) FROM replicacion").fetchone()[0]
+        received = {
+            'ventas': conn.execute("SELECT COUNT(*), COALESCE(SUM(total), 0) FROM ventas WHERE nodo = ?",
+                                   (nodo,)).fetchone(),
+            'detalle': conn.execute("SELECT COUNT(*), COALESCE(SUM(cantidad), 0) FROM detalle_ventas "
+                                    "WHERE nodo = ?", (nodo,)).fetchone(),
+            'movimientos': conn.execute("SELECT COUNT(*), COALESCE(SUM(cantidad), 0) "
+                                        "FROM movimientos_inventario WHERE nodo = ?", (nodo,)).fetchone(),
+        }
+        for table, (count, amount) in expected.items():
+            got_count, got_amount = received[table]
+            if got_count != count or abs(got_amount - amount) > 0.005:
+                problems.append(f"{os.path.basename(db_name)} {table}: local {count} ({amount:.2f}), "
+                                f"central {got_count} ({got_amount:.2f})")
+        if central.confirmed(nodo) != last_seq:
+            problems.append(f"{os.path.basename(db_name)}: último registro {last_seq}, "
+                            f"confirmado {central.confirmed(nodo)}")
+    return problems
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replicación de muchos locales a la base central")
+    parser.add_argument('--terminals', type=int, default=30)
+    parser.add_argument('--sales', type=int, default=200, help="ventas por local")
+    parser.add_argument('--outage', type=float, default=3.0, help="segundos de cada corte de la central")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    db_names = [new_local(t) for t in range(args.terminals)]
+    central_path = temp_db_path("central.db")
+    try:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+
+        def serve():
+            store = CentralStore(central_path)
+            server = create_server(store, "127.0.0.1", port)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            return store, server
+
+        def shutdown(store, server):
+            server.shutdown()
+            server.server_close()
+            store.close()
+
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=local_store, args=(db_name, url, args.sales, args.seed, t, results))
+                     for t, db_name in enumerate(db_names)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+
+        # Sin central al comienzo: los locales venden sin conexión
+        time.sleep(args.outage)
+        store, server = serve()
+        print(f"Central levantada a los {time.perf_counter() - start:.1f} s")
+        time.sleep(args.outage)
+        shutdown(store, server)
+        print(f"Central cortada a los {time.perf_counter() - start:.1f} s")
+        time.sleep(args.outage)
+        store, server = serve()
+        print(f"Central levantada de nuevo a los {time.perf_counter() - start:.1f} s")
+
+        outcomes = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+        status = store.status()
+        shutdown(store, server)
+
+        received = sum(node['registros'] for node in status)
+        print(f"{args.terminals} locales, {received} registros recibidos en {elapsed:.1f} s "
+              f"({received / elapsed:.0f} registros/s, con {2 * args.outage:.0f} s de central caída)")
+
+        store = CentralStore(central_path)
+        problems = [f"error: {error}" for _, _, errors in outcomes for error in errors] + verify(store, db_names)
+        store.close()
+
+        for problem in problems[:30]:
+            print(problem)
+        if len(problems) > 30:
+            print(f"... y {len(problems) - 30} problemas más")
+        if problems:
+            print("INCONSISTENCIAS ENCONTRADAS")
+            sys.exit(1)
+        print("La central tiene todas las ventas y movimientos de cada local, sin duplicados")
+    finally:
+        for db_name in db_names + [central_path]:
+            remove_temp_db(db_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Prueba de estrés de varias terminales sobre la misma base
+
+Lanza N terminales (procesos) que venden al mismo tiempo contra un único
+archivo de base, como las cajas de un local: escanean productos con
+CheckoutService, cierran ventas y cada tanto registran una recepción de
+mercadería o un ajuste de stock. En paralelo, procesos lectores consultan
+los reportes. Al terminar verifica que:
+
+  - ninguna venta ni movimiento haya fallado (p. ej. "database is locked")
+  - todas las ventas confirmadas estén en la base, con facturas únicas
+  - el stock de cada producto sea el inicial más entradas menos salidas
+    de movimientos_inventario
+  - las salidas por venta coincidan con el detalle de ventas
+  - los acumulados diarios coincidan con el historial
+  - la base esté en modo WAL y pase integrity_check
+
+Uso:
+    python benchmarks/stress_terminals.py [--terminals 8] [--sales 300] [--readers 2] [--seed 1]
+
+Termina con código 1 si encuentra alguna inconsistencia.
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+from argparse import Namespace
+from datetime import date
+
+from bench_checkout import basket_size, percentile, pick_code
+from common import new_database, remove_temp_db
+from database import Database
+from pos_core import CheckoutService, OutOfStock
+import maintenance
+import reports
+
+
+PRODUCTS = 2000
+# Una recepción cada tantas ventas, y un ajuste de salida cada tantas
+RECEIVING_EVERY = 25
+ADJUSTMENT_EVERY = 40
+
+
+def terminal(db_name, terminal_id, sales, seed, results):
+    rng = random.Random(seed * 1000 + terminal_id)
+    checkout_ms = []
+    sold = 0
+    errors = []
+    try:
+        db = Database(db_name)
+        service = CheckoutService(db, usuario_id=1)
+        for number in range(1, sales + 1):
+            for _ in range(min(basket_size(rng), 20)):
+                try:
+                    service.add_by_code(pick_code(rng, PRODUCTS), rng.choice((1, 1, 1, 2, 3)))
+                except OutOfStock:
+                    pass
+
+            if service.cart:
+                start = time.perf_counter()
+                try:
+                    service.checkout()
+                    sold += 1
+                except Exception as e:
+                    errors.append(f"venta: {e}")
+                    service.clear()
+                checkout_ms.append((time.perf_counter() - start) * 1000)
+
+            try:
+                if number % RECEIVING_EVERY == 0:
+                    movements = [(rng.randint(1, PRODUCTS), "entrada", rng.randint(10, 100),
+                                  f"Recepción T{terminal_id}-{number}") for _ in range(10)]
+                    db.apply_stock_movements(movements, 1)
+                if number % ADJUSTMENT_EVERY == 0:
+                    db.update_stock(rng.randint(1, PRODUCTS), 1, "salida", 1, "Ajuste por rotura")
+            except Exception as e:
+                errors.append(f"movimiento: {e}")
+        db.close()
+    except Exception as e:
+        errors.append(f"terminal: {e}")
+    finally:
+        results.put((sold, checkout_ms, errors))
+
+
+def reader(db_name, done, results):
+    # Reportes mientras las terminales venden: en WAL no deben bloquearlas
+    queries = 0
+    errors = []
+    try:
+        db = Database(db_name)
+        today = date.today()
+        while not done.is_set():
+            reports.sales_pager(db, today).next_page()
+            db.get_sales_summary(today)
+            db.get_top_products(today, today, 10)
+            reports.low_stock_products(db)
+            reports.movement_totals(db, today, today, "todos")
+            queries += 5
+        db.close()
+    except Exception as e:
+        errors.append(f"lector: {e}")
+    finally:
+        results.put((queries, errors))
+
+
+def verify(db, initial_stock, sold):
+    conn = db.get_connection()
+    problems = []
+
+    sales, invoices = conn.execute("SELECT COUNT(*), COUNT(DISTINCT numero_factura) FROM ventas").fetchone()
+    if sales != sold:
+        problems.append(f"{sold} ventas confirmadas por las terminales, {sales} en la base")
+    if invoices != sales:
+        problems.append(f"{sales - invoices} números de factura repetidos")
+
+    movements = dict(((producto_id, delta) for producto_id, delta in conn.execute('''
+        SELECT producto_id, SUM(CASE WHEN tipo_movimiento = 'entrada' THEN cantidad ELSE -cantidad END)
+        FROM movimientos_inventario GROUP BY producto_id
+    ''')))
+    for producto_id, stock in conn.execute("SELECT id, stock FROM productos"):
+        expected = initial_stock[producto_id] + movements.get(producto_id, 0)
+        if stock != expected:
+            problems.append(f"producto {producto_id}: stock {stock}, según movimientos {expected}")
+
+    sold_by_movements = dict(conn.execute('''
+        SELECT producto_id, SUM(cantidad) FROM movimientos_inventario
+        WHERE tipo_movimiento = 'salida' AND motivo LIKE 'Venta %'
+        GROUP BY producto_id
+    ''').fetchall())
+    sold_by_details = dict(conn.execute(
+        "SELECT producto_id, SUM(cantidad) FROM detalle_ventas GROUP BY producto_id").fetchall())
+    if sold_by_movements != sold_by_details:
+        problems.append("las salidas por venta no coinciden con el detalle de ventas")
+
+    if maintenance.verify_rollups(db, Namespace(top=50)) != 0:
+        problems.append("los acumulados diarios no coinciden con el historial")
+
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    if journal_mode != "wal":
+        problems.append(f"modo de diario {journal_mode}, se esperaba wal")
+    integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    if integrity != "ok":
+        problems.append(f"integrity_check: {integrity}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estrés de varias terminales sobre una base")
+    parser.add_argument('--terminals', type=int, default=8)
+    parser.add_argument('--sales', type=int, default=300, help="ventas por terminal")
+    parser.add_argument('--readers', type=int, default=2, help="procesos consultando reportes")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    db, _ = new_database(PRODUCTS)
+    db_name = db.db_name
+    initial_stock = dict(db.get_connection().execute("SELECT id, stock FROM productos").fetchall())
+    db.close()
+
+    try:
+        results = multiprocessing.Queue()
+        reader_results = multiprocessing.Queue()
+        done = multiprocessing.Event()
+        terminals = [multiprocessing.Process(target=terminal, args=(db_name, t, args.sales, args.seed, results))
+                     for t in range(args.terminals)]
+        readers = [multiprocessing.Process(target=reader, args=(db_name, done, reader_results))
+                   for _ in range(args.readers)]
+
+        start = time.perf_counter()
+        for process in terminals + readers:
+            process.start()
+        outcomes = [results.get() for _ in terminals]
+        elapsed = time.perf_counter() - start
+        done.set()
+        reader_outcomes = [reader_results.get() for _ in readers]
+        for process in terminals + readers:
+            process.join()
+
+        sold = sum(outcome[0] for outcome in outcomes)
+        checkout_ms = [ms for outcome in outcomes for ms in outcome[1]]
+        errors = [error for outcome in outcomes + reader_outcomes for error in outcome[-1]]
+        queries = sum(outcome[0] for outcome in reader_outcomes)
+
+        print(f"{args.terminals} terminales, {sold} ventas en {elapsed:.1f} s: {sold / elapsed:.0f} ventas/s")
+        print(f"Cierre de venta: p50 {percentile(checkout_ms, 0.5):.2f} ms, p99 {percentile(checkout_ms, 0.99):.2f} ms")
+        print(f"{args.readers} lectores, {queries} consultas de reportes")
+
+        db = Database(db_name)
+        problems = [f"error: {error}" for error in errors] + verify(db, initial_stock, sold)
+        db.close()
+
+        for problem in problems[:30]:
+            print(problem)
+        if len(problems) > 30:
+            print(f"... y {len(problems) - 30} problemas más")
+        if problems:
+            print("INCONSISTENCIAS ENCONTRADAS")
+            sys.exit(1)
+        print("Stock, movimientos y ventas consistentes")
+    finally:
+        remove_temp_db(db_name)
+
+
+if __name__ == "__main__":
+    main()
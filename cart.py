@@ -0,0 +1,79 @@
+class InsufficientStock(Exception):
+    def __init__(self, producto_id, disponible, solicitado):
+        super().__init__(f"Stock disponible: {disponible}, solicitado: {solicitado}")
+        self.producto_id = producto_id
+        self.disponible = disponible
+        self.solicitado = solicitado
+
+class Cart:
+    """Carrito de compras indexado por producto_id.
+
+    Cada línea es un dict con las claves que consume Database.create_sale
+    (producto_id, nombre, precio, cantidad, subtotal), así que el carrito se
+    pasa tal cual como items: iterarlo devuelve las líneas en orden de carga.
+    Los totales se mantienen al agregar o quitar líneas, sin volver a sumar.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self.subtotal = 0.0
+        self.discount = 0.0
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __contains__(self, producto_id):
+        return producto_id in self._items
+
+    @property
+    def total(self):
+        return self.subtotal - self.discount
+
+    def get(self, producto_id):
+        return self._items.get(producto_id)
+
+    def add(self, producto_id, nombre, precio, cantidad, stock):
+        # Suma cantidad a la línea del producto (o la crea) y la devuelve.
+        # InsufficientStock si la cantidad total supera el stock disponible
+        item = self._items.get(producto_id)
+        new_quantity = cantidad + (item['cantidad'] if item else 0)
+        if new_quantity > stock:
+            raise InsufficientStock(producto_id, stock, new_quantity)
+
+        if item is None:
+            item = {'producto_id': producto_id, 'nombre': nombre, 'precio': precio,
+                    'cantidad': 0, 'subtotal': 0.0}
+            self._items[producto_id] = item
+
+        self.subtotal -= item['subtotal']
+        item['cantidad'] = new_quantity
+        item['subtotal'] = new_quantity * item['precio']
+        self.subtotal += item['subtotal']
+        return item
+
+    def remove(self, producto_id):
+        item = self._items.pop(producto_id, None)
+        if item is not None:
+            self.subtotal -= item['subtotal']
+            self.discount = min(self.discount, self.subtotal)
+        if not self._items:
+            # Sin líneas el subtotal vuelve a cero exacto, sin restos de redondeo
+            self.subtotal = 0.0
+            self.discount = 0.0
+        return item
+
+    def clear(self):
+        self._items.clear()
+        self.subtotal = 0.0
+        self.discount = 0.0
+
+    def set_discount(self, amount):
+        if amount < 0 or amount > self.subtotal:
+            raise ValueError("El descuento debe estar entre 0 y el subtotal")
+        self.discount = amount
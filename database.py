@@ -1,262 +1,1075 @@
-import sqlite3
-import hashlib
-from datetime import datetime
-
-class Database:
-    def __init__(self, db_name="pos_system.db"):
-        self.db_name = db_name
-        self.init_database()
-    
-    def get_connection(self):
-        return sqlite3.connect(self.db_name)
-    
-    def init_database(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Tabla de usuarios
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS usuarios (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                nombre TEXT NOT NULL,
-                rol TEXT NOT NULL,
-                activo INTEGER DEFAULT 1,
-                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Tabla de categorías
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS categorias (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT UNIQUE NOT NULL,
-                descripcion TEXT,
-                activa INTEGER DEFAULT 1
-            )
-        ''')
-        
-        # Tabla de productos
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS productos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                codigo TEXT UNIQUE NOT NULL,
-                nombre TEXT NOT NULL,
-                descripcion TEXT,
-                categoria_id INTEGER,
-                precio_venta REAL NOT NULL,
-                precio_compra REAL,
-                stock INTEGER DEFAULT 0,
-                stock_minimo INTEGER DEFAULT 0,
-                activo INTEGER DEFAULT 1,
-                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (categoria_id) REFERENCES categorias (id)
-            )
-        ''')
-        
-        # Tabla de ventas
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS ventas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                numero_factura TEXT UNIQUE NOT NULL,
-                usuario_id INTEGER NOT NULL,
-                total REAL NOT NULL,
-                descuento REAL DEFAULT 0,
-                impuesto REAL DEFAULT 0,
-                fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                estado TEXT DEFAULT 'completada',
-                FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
-            )
-        ''')
-        
-        # Tabla de detalles de venta
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS detalle_ventas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                venta_id INTEGER NOT NULL,
-                producto_id INTEGER NOT NULL,
-                cantidad INTEGER NOT NULL,
-                precio_unitario REAL NOT NULL,
-                subtotal REAL NOT NULL,
-                FOREIGN KEY (venta_id) REFERENCES ventas (id),
-                FOREIGN KEY (producto_id) REFERENCES productos (id)
-            )
-        ''')
-        
-        # Tabla de movimientos de inventario
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS movimientos_inventario (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                producto_id INTEGER NOT NULL,
-                tipo_movimiento TEXT NOT NULL,
-                cantidad INTEGER NOT NULL,
-                motivo TEXT,
-                usuario_id INTEGER,
-                fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (producto_id) REFERENCES productos (id),
-                FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        
-        # Crear usuario administrador por defecto
-        self.create_default_admin()
-        self.create_default_categories()
-    
-    def create_default_admin(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Verificar si ya existe un admin
-        cursor.execute("SELECT COUNT(*) FROM usuarios WHERE rol = 'admin'")
-        if cursor.fetchone()[0] == 0:
-            password_hash = hashlib.sha256("admin123".encode()).hexdigest()
-            cursor.execute('''
-                INSERT INTO usuarios (username, password, nombre, rol)
-                VALUES (?, ?, ?, ?)
-            ''', ("admin", password_hash, "Administrador", "admin"))
-        
-        conn.commit()
-        conn.close()
-    
-    def create_default_categories(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        default_categories = [
-            ("General", "Productos generales"),
-            ("Electrónicos", "Dispositivos electrónicos"),
-            ("Ropa", "Vestimenta y accesorios"),
-            ("Alimentos", "Productos alimenticios"),
-            ("Hogar", "Artículos para el hogar")
-        ]
-        
-        for nombre, descripcion in default_categories:
-            cursor.execute('''
-                INSERT OR IGNORE INTO categorias (nombre, descripcion)
-                VALUES (?, ?)
-            ''', (nombre, descripcion))
-        
-        conn.commit()
-        conn.close()
-    
-    def hash_password(self, password):
-        return hashlib.sha256(password.encode()).hexdigest()
-    
-    def authenticate_user(self, username, password):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        password_hash = self.hash_password(password)
-        cursor.execute('''
-            SELECT id, username, nombre, rol FROM usuarios 
-            WHERE username = ? AND password = ? AND activo = 1
-        ''', (username, password_hash))
-        
-        user = cursor.fetchone()
-        conn.close()
-        return user
-    
-    def get_products(self, search_term=""):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        if search_term:
-            cursor.execute('''
-                SELECT p.id, p.codigo, p.nombre, p.descripcion, c.nombre as categoria,
-                       p.precio_venta, p.stock, p.stock_minimo
-                FROM productos p
-                LEFT JOIN categorias c ON p.categoria_id = c.id
-                WHERE p.activo = 1 AND (p.codigo LIKE ? OR p.nombre LIKE ? OR p.descripcion LIKE ?)
-                ORDER BY p.nombre
-            ''', (f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"))
-        else:
-            cursor.execute('''
-                SELECT p.id, p.codigo, p.nombre, p.descripcion, c.nombre as categoria,
-                       p.precio_venta, p.stock, p.stock_minimo
-                FROM productos p
-                LEFT JOIN categorias c ON p.categoria_id = c.id
-                WHERE p.activo = 1
-                ORDER BY p.nombre
-            ''')
-        
-        products = cursor.fetchall()
-        conn.close()
-        return products
-    
-    def get_product_by_code(self, codigo):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT p.id, p.codigo, p.nombre, p.descripcion, c.nombre as categoria,
-                   p.precio_venta, p.stock, p.stock_minimo
-            FROM productos p
-            LEFT JOIN categorias c ON p.categoria_id = c.id
-            WHERE p.codigo = ? AND p.activo = 1
-        ''', (codigo,))
-        
-        product = cursor.fetchone()
-        conn.close()
-        return product
-    
-    def update_stock(self, producto_id, cantidad, tipo_movimiento, usuario_id, motivo=""):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Actualizar stock del producto
-        if tipo_movimiento == "entrada":
-            cursor.execute('''
-                UPDATE productos SET stock = stock + ? WHERE id = ?
-            ''', (cantidad, producto_id))
-        elif tipo_movimiento == "salida":
-            cursor.execute('''
-                UPDATE productos SET stock = stock - ? WHERE id = ?
-            ''', (cantidad, producto_id))
-        
-        # Registrar movimiento
-        cursor.execute('''
-            INSERT INTO movimientos_inventario (producto_id, tipo_movimiento, cantidad, motivo, usuario_id)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (producto_id, tipo_movimiento, cantidad, motivo, usuario_id))
-        
-        conn.commit()
-        conn.close()
-    
-    def create_sale(self, usuario_id, items, descuento=0, impuesto=0):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Generar número de factura
-        numero_factura = f"FAC-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
-        # Calcular total
-        total = sum(item['subtotal'] for item in items)
-        total_final = total - descuento + impuesto
-        
-        # Crear venta
-        cursor.execute('''
-            INSERT INTO ventas (numero_factura, usuario_id, total, descuento, impuesto)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (numero_factura, usuario_id, total_final, descuento, impuesto))
-        
-        venta_id = cursor.lastrowid
-        
-        # Crear detalles de venta y actualizar stock
-        for item in items:
-            cursor.execute('''
-                INSERT INTO detalle_ventas (venta_id, producto_id, cantidad, precio_unitario, subtotal)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (venta_id, item['producto_id'], item['cantidad'], item['precio'], item['subtotal']))
-            
-            # Actualizar stock
-            self.update_stock(item['producto_id'], item['cantidad'], "salida", usuario_id, f"Venta {numero_factura}")
-        
-        conn.commit()
-        conn.close()
-        
-        return numero_factura, total_final
-
+import sqlite3
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from query_profiler import ProfiledConnection, QueryProfiler
+
+# Versión mínima de SQLite: UPDATE ... FROM (3.33) al descontar stock y
+# UPDATE ... RETURNING (3.35) al numerar facturas
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+def check_sqlite_version():
+    # Falla al abrir la base, no en la primera venta con un error de sintaxis
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        required = ".".join(map(str, MIN_SQLITE_VERSION))
+        raise RuntimeError(f"Este sistema necesita SQLite {required} o superior y Python trae "
+                           f"SQLite {sqlite3.sqlite_version}. Actualice Python en esta terminal.")
+
+def date_range(start_date, end_date=None):
+    # Límites [inicio, fin) como texto para filtrar columnas de fecha
+    # ('YYYY-MM-DD HH:MM:SS') sin envolverlas en DATE(), de modo que las
+    # consultas puedan recorrer el índice sobre la columna
+    end_date = end_date or start_date
+    return start_date.isoformat(), (end_date + timedelta(days=1)).isoformat()
+
+def create_product_search_index(cursor):
+    # Índice FTS5 con tokenizador trigram sobre código, nombre y descripción,
+    # mantenido por triggers. Si esta compilación de SQLite no trae FTS5 (o
+    # el tokenizador trigram) se omite y la búsqueda sigue usando LIKE.
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5(
+                codigo, nombre, descripcion,
+                content='productos', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        return
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS productos_fts_insert AFTER INSERT ON productos BEGIN
+            INSERT INTO productos_fts (rowid, codigo, nombre, descripcion)
+            VALUES (new.id, new.codigo, new.nombre, new.descripcion);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS productos_fts_delete AFTER DELETE ON productos BEGIN
+            INSERT INTO productos_fts (productos_fts, rowid, codigo, nombre, descripcion)
+            VALUES ('delete', old.id, old.codigo, old.nombre, old.descripcion);
+        END
+    ''')
+    # Solo cuando cambian columnas indexadas: los cambios de stock no lo tocan
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS productos_fts_update
+        AFTER UPDATE OF codigo, nombre, descripcion ON productos BEGIN
+            INSERT INTO productos_fts (productos_fts, rowid, codigo, nombre, descripcion)
+            VALUES ('delete', old.id, old.codigo, old.nombre, old.descripcion);
+            INSERT INTO productos_fts (rowid, codigo, nombre, descripcion)
+            VALUES (new.id, new.codigo, new.nombre, new.descripcion);
+        END
+    ''')
+    cursor.execute("INSERT INTO productos_fts (productos_fts) VALUES ('rebuild')")
+
+def rebuild_daily_sales(cursor):
+    # Recalcula los acumulados diarios por cajero desde el historial de ventas.
+    # El día es el de la columna fecha, igual que en los filtros de date_range
+    cursor.execute("DELETE FROM ventas_diarias")
+    cursor.execute('''
+        INSERT INTO ventas_diarias (fecha, usuario_id, ventas, bruto, descuento, neto)
+        SELECT date(fecha), usuario_id, COUNT(*), SUM(total), SUM(descuento), SUM(total - descuento)
+        FROM ventas
+        GROUP BY date(fecha), usuario_id
+    ''')
+
+def rebuild_daily_product_sales(cursor):
+    # Recalcula las unidades e importes vendidos por producto y día
+    cursor.execute("DELETE FROM ventas_producto_diarias")
+    cursor.execute('''
+        INSERT INTO ventas_producto_diarias (fecha, producto_id, cantidad, total, precio_suma, lineas)
+        SELECT date(v.fecha), dv.producto_id, SUM(dv.cantidad), SUM(dv.subtotal),
+               SUM(dv.precio_unitario), COUNT(*)
+        FROM detalle_ventas dv
+        JOIN ventas v ON dv.venta_id = v.id
+        GROUP BY date(v.fecha), dv.producto_id
+    ''')
+
+# Registro compacto de producto, con el mismo orden de columnas que get_products
+Product = namedtuple('Product', ('id', 'codigo', 'nombre', 'descripcion', 'categoria',
+                                 'precio_venta', 'stock', 'stock_minimo'))
+
+class ProductCatalog:
+    # Caché en memoria de los productos activos con índices hash por código y
+    # por id. Se carga completa desde la base y se parchea tras cada escritura.
+    # Guarda el stock tal como está en la base; las unidades de las ventas
+    # en cola (reservadas) se llevan aparte y se descuentan al leer
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_code = {}
+        # {producto_id: unidades reservadas por ventas aún no registradas}
+        self._reserved = {}
+        # ids ordenados por nombre para los listados; None si hay que recalcularlo
+        self._ordered_ids = None
+        self.loaded = False
+        self.loaded_at = None
+    
+    def __len__(self):
+        return len(self._by_id)
+    
+    def load(self, rows):
+        # rows llegan ordenadas por nombre (get_products)
+        by_id = {}
+        by_code = {}
+        for row in rows:
+            product = Product._make(row)
+            by_id[product.id] = product
+            by_code[product.codigo] = product
+        
+        with self._lock:
+            self._by_id = by_id
+            self._by_code = by_code
+            self._ordered_ids = list(by_id)
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+    
+    def invalidate(self):
+        with self._lock:
+            self._by_id = {}
+            self._by_code = {}
+            self._ordered_ids = None
+            self.loaded = False
+    
+    def by_code(self, codigo):
+        return self._available(self._by_code.get(codigo))
+    
+    def by_id(self, producto_id):
+        return self._available(self._by_id.get(producto_id))
+    
+    def _available(self, product):
+        # Stock de la base menos lo reservado por las ventas en cola
+        if product is None or not self._reserved:
+            return product
+        reserved = self._reserved.get(product.id)
+        return product._replace(stock=product.stock - reserved) if reserved else product
+    
+    def ordered_ids(self):
+        # Lista de ids ordenada por nombre, compartida: no debe modificarse.
+        # Solo se recalcula cuando se agregan, quitan o renombran productos
+        with self._lock:
+            if self._ordered_ids is None:
+                products = sorted(self._by_id.values(), key=lambda product: (product.nombre, product.id))
+                self._ordered_ids = [product.id for product in products]
+            return self._ordered_ids
+    
+    def put(self, row):
+        product = Product._make(row)
+        with self._lock:
+            previous = self._by_id.get(product.id)
+            if previous is not None and previous.codigo != product.codigo:
+                self._by_code.pop(previous.codigo, None)
+            if previous is None or previous.nombre != product.nombre:
+                self._ordered_ids = None
+            self._by_id[product.id] = product
+            self._by_code[product.codigo] = product
+        return self._available(product)
+    
+    def discard(self, producto_id):
+        with self._lock:
+            product = self._by_id.pop(producto_id, None)
+            if product is not None:
+                self._by_code.pop(product.codigo, None)
+                self._ordered_ids = None
+    
+    def reserve(self, quantities):
+        # quantities: pares (producto_id, cantidad) de una venta en cola. Las
+        # recargas y los stocks leídos de la base no pisan las reservas
+        with self._lock:
+            for producto_id, cantidad in quantities:
+                self._reserved[producto_id] = self._reserved.get(producto_id, 0) + cantidad
+    
+    def release(self, quantities):
+        # La venta ya se registró (su salida está en el stock de la base) o falló
+        with self._lock:
+            for producto_id, cantidad in quantities:
+                reserved = self._reserved.get(producto_id, 0) - cantidad
+                if reserved > 0:
+                    self._reserved[producto_id] = reserved
+                else:
+                    self._reserved.pop(producto_id, None)
+    
+    def update_stock(self, stocks):
+        # stocks: pares (producto_id, stock) leídos de la base tras escribir
+        with self._lock:
+            for producto_id, stock in stocks:
+                product = self._by_id.get(producto_id)
+                if product is not None:
+                    product = product._replace(stock=stock)
+                    self._by_id[producto_id] = product
+                    self._by_code[product.codigo] = product
+
+class Database:
+    # Pragmas aplicados a cada conexión persistente al abrirla
+    CONNECTION_PRAGMAS = (
+        # WAL: varias terminales leen mientras una escribe, y el modo queda
+        # guardado en el archivo (en una base ya en WAL no hace nada)
+        "PRAGMA journal_mode = WAL",
+        # Punto de control automático solo como red de seguridad (~40 MB):
+        # los habituales los hace checkpoint() cuando el escritor está ocioso
+        "PRAGMA wal_autocheckpoint = 10000",
+        "PRAGMA cache_size = -16000",      # ~16 MB de caché de páginas por conexión
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA mmap_size = 67108864",     # 64 MB mapeados en memoria
+    )
+    # Espera de SQLite por el bloqueo de escritura de otra terminal (segundos)
+    BUSY_TIMEOUT = 2.0
+    # Reintentos de BEGIN si el bloqueo sigue tomado tras BUSY_TIMEOUT, con
+    # espera exponencial desde BEGIN_BACKOFF segundos
+    BEGIN_RETRIES = 4
+    BEGIN_BACKOFF = 0.05
+    # Sentencias preparadas que sqlite3 mantiene en caché por conexión
+    STATEMENT_CACHE_SIZE = 256
+    
+    # Migraciones del esquema en orden: (versión, pasos). Cada paso es una
+    # sentencia SQL o una función que recibe el cursor. PRAGMA user_version
+    # guarda la última versión aplicada en el propio archivo de la base
+    MIGRATIONS = (
+        (1, (
+            # Reportes por fecha
+            "CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha)",
+            "CREATE INDEX IF NOT EXISTS idx_movimientos_fecha ON movimientos_inventario (fecha)",
+            # Detalle de ventas por venta y por producto (productos más vendidos)
+            "CREATE INDEX IF NOT EXISTS idx_detalle_ventas_venta ON detalle_ventas (venta_id)",
+            "CREATE INDEX IF NOT EXISTS idx_detalle_ventas_producto ON detalle_ventas (producto_id)",
+            # Historial de movimientos por producto
+            "CREATE INDEX IF NOT EXISTS idx_movimientos_producto ON movimientos_inventario (producto_id)",
+            # Listados de productos ordenados por nombre
+            "CREATE INDEX IF NOT EXISTS idx_productos_nombre ON productos (nombre)",
+        )),
+        (2, (
+            # Búsqueda de productos por texto
+            create_product_search_index,
+        )),
+        (3, (
+            # Secuencias compartidas por todas las terminales (números de factura)
+            '''
+            CREATE TABLE IF NOT EXISTS secuencias (
+                nombre TEXT PRIMARY KEY,
+                valor INTEGER NOT NULL
+            )
+            ''',
+            "INSERT OR IGNORE INTO secuencias (nombre, valor) SELECT 'factura', COALESCE(MAX(id), 0) FROM ventas",
+        )),
+        (4, (
+            # Identificador único generado por la terminal: permite reintentar
+            # una venta (diario de ventas pendientes) sin duplicarla
+            "ALTER TABLE ventas ADD COLUMN uid TEXT",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_ventas_uid ON ventas (uid)",
+        )),
+        (5, (
+            # Acumulados de ventas por día y cajero, mantenidos por create_sale:
+            # los resúmenes de un período leen un registro por día y cajero
+            '''
+            CREATE TABLE IF NOT EXISTS ventas_diarias (
+                fecha TEXT NOT NULL,
+                usuario_id INTEGER NOT NULL,
+                ventas INTEGER NOT NULL DEFAULT 0,
+                bruto REAL NOT NULL DEFAULT 0,
+                descuento REAL NOT NULL DEFAULT 0,
+                neto REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (fecha, usuario_id)
+            ) WITHOUT ROWID
+            ''',
+            rebuild_daily_sales,
+        )),
+        (6, (
+            # Unidades e importes vendidos por producto y día, mantenidos por
+            # create_sale. precio_suma / lineas da el precio unitario promedio
+            '''
+            CREATE TABLE IF NOT EXISTS ventas_producto_diarias (
+                fecha TEXT NOT NULL,
+                producto_id INTEGER NOT NULL,
+                cantidad INTEGER NOT NULL DEFAULT 0,
+                total REAL NOT NULL DEFAULT 0,
+                precio_suma REAL NOT NULL DEFAULT 0,
+                lineas INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (fecha, producto_id)
+            ) WITHOUT ROWID
+            ''',
+            rebuild_daily_product_sales,
+        )),
+        (7, (
+            # Registro de replicación: cada venta y cada lote de movimientos
+            # se agrega en la misma transacción que los confirma. El envío a
+            # la base central (replication.py) avanza 'replicacion' en
+            # secuencias hasta el último registro aceptado por la central
+            '''
+            CREATE TABLE IF NOT EXISTS replicacion (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                tipo TEXT NOT NULL,
+                datos TEXT NOT NULL,
+                fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+            "INSERT OR IGNORE INTO secuencias (nombre, valor) VALUES ('replicacion', 0)",
+            # Identificador del local ante la base central
+            '''
+            CREATE TABLE IF NOT EXISTS configuracion (
+                clave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL
+            )
+            ''',
+            "INSERT OR IGNORE INTO configuracion (clave, valor) VALUES ('nodo', lower(hex(randomblob(8))))",
+        )),
+        (8, (
+            # Registros que la central rechazó repetidamente: se apartan del
+            # registro de replicación para que no frenen a los siguientes
+            '''
+            CREATE TABLE IF NOT EXISTS replicacion_rechazos (
+                seq INTEGER PRIMARY KEY,
+                tipo TEXT NOT NULL,
+                datos TEXT NOT NULL,
+                fecha TIMESTAMP,
+                error TEXT,
+                apartado TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+        )),
+        (9, (
+            # Contador de cambios del catálogo: toda escritura en productos o
+            # en nombres de categorías lo avanza, la haga esta terminal u otra.
+            # Cada Database sabe hasta qué valor está al día su caché
+            "INSERT OR IGNORE INTO secuencias (nombre, valor) VALUES ('catalogo', 0)",
+            '''
+            CREATE TRIGGER IF NOT EXISTS productos_catalogo_insert AFTER INSERT ON productos BEGIN
+                UPDATE secuencias SET valor = valor + 1 WHERE nombre = 'catalogo';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS productos_catalogo_update AFTER UPDATE ON productos BEGIN
+                UPDATE secuencias SET valor = valor + 1 WHERE nombre = 'catalogo';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS productos_catalogo_delete AFTER DELETE ON productos BEGIN
+                UPDATE secuencias SET valor = valor + 1 WHERE nombre = 'catalogo';
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS categorias_catalogo_update AFTER UPDATE OF nombre ON categorias BEGIN
+                UPDATE secuencias SET valor = valor + 1 WHERE nombre = 'catalogo';
+            END
+            ''',
+        )),
+    )
+    
+    # Versión del esquema tras aplicar todas las migraciones
+    SCHEMA_VERSION = MIGRATIONS[-1][0]
+    
+    # Movimientos registrados después del id dado, como arreglo JSON para el
+    # registro de replicación (el código identifica al producto en la central)
+    REPLICATION_MOVEMENTS = '''(
+        SELECT json_group_array(json_object(
+            'producto_id', mi.producto_id, 'codigo', p.codigo, 'tipo', mi.tipo_movimiento,
+            'cantidad', mi.cantidad, 'motivo', mi.motivo, 'usuario_id', mi.usuario_id, 'fecha', mi.fecha))
+        FROM movimientos_inventario mi JOIN productos p ON p.id = mi.producto_id
+        WHERE mi.id > ?)'''
+    
+    # Las ventas y movimientos se agregan al registro de replicación solo
+    # después de que un enviador lo activó (enable_replication)
+    REPLICATION_ENABLED = "EXISTS (SELECT 1 FROM configuracion WHERE clave = 'replicacion')"
+    
+    # Antigüedad (segundos) a partir de la cual los listados recargan un
+    # catálogo que otras terminales modificaron
+    CATALOG_MAX_AGE = 30
+    # Intervalo mínimo (segundos) entre lecturas del contador de cambios del
+    # catálogo: entre una y otra los escaneos no consultan la base
+    CATALOG_CHECK_INTERVAL = 1.0
+    
+    # Máximo de resultados devueltos por una búsqueda de productos
+    SEARCH_LIMIT = 200
+    # El tokenizador trigram necesita al menos tres caracteres
+    FTS_MIN_TERM_LENGTH = 3
+    
+    def __init__(self, db_name="pos_system.db"):
+        check_sqlite_version()
+        self.db_name = db_name
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        self._has_product_fts = None
+        self.catalog = ProductCatalog()
+        # Valor del contador 'catalogo' hasta el que la caché está al día, y
+        # último valor leído de la base (con el momento de la lectura)
+        self._catalog_lock = threading.Lock()
+        self._catalog_synced = None
+        self._catalog_seen = None
+        self._catalog_checked = None
+        # Desactivado hasta que un administrador lo encienda
+        self.profiler = QueryProfiler()
+        self.init_database()
+    
+    def __enter__(self):
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def open(self):
+        # Las conexiones se abren bajo demanda; abrir la del hilo actual
+        # deja la caché de páginas caliente desde el inicio
+        self.get_connection()
+        return self
+    
+    def close(self):
+        # Cerrar todas las conexiones abiertas por cualquier hilo
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+            self._generation += 1
+        
+        for conn in connections:
+            conn.close()
+    
+    def release_connection(self):
+        # Cerrar la conexión del hilo actual (para hilos de trabajo que terminan)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.generation != self._generation:
+            return
+        
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        self._local.conn = None
+        conn.close()
+    
+    def _connect(self):
+        # Autocommit: las transacciones se abren explícitamente con transaction()
+        conn = sqlite3.connect(self.db_name,
+                               isolation_level=None,
+                               timeout=self.BUSY_TIMEOUT,
+                               check_same_thread=False,
+                               cached_statements=self.STATEMENT_CACHE_SIZE,
+                               factory=ProfiledConnection)
+        conn.profiler = self.profiler
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def get_connection(self):
+        # Una conexión persistente por hilo; no debe cerrarse desde el llamador
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.generation == self._generation:
+            return conn
+        
+        conn = self._connect()
+        with self._connections_lock:
+            self._connections.append(conn)
+            self._local.generation = self._generation
+        self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def is_busy_error(error):
+        # Bloqueo tomado por otra conexión ("database is locked" / "busy")
+        message = str(error).lower()
+        return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+    
+    def _begin(self, conn, immediate):
+        statement = "BEGIN IMMEDIATE" if immediate else "BEGIN"
+        for attempt in range(self.BEGIN_RETRIES):
+            try:
+                conn.execute(statement)
+                return
+            except sqlite3.OperationalError as e:
+                if not self.is_busy_error(e) or attempt == self.BEGIN_RETRIES - 1:
+                    raise
+            # Espera exponencial con variación para no reintentar todas juntas
+            time.sleep(self.BEGIN_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5))
+    
+    @contextmanager
+    def transaction(self, immediate=True):
+        # Confirma al salir o revierte ante cualquier excepción. Las llamadas
+        # anidadas se unen a la transacción que ya está abierta. Por defecto
+        # el bloqueo de escritura se toma al empezar (BEGIN IMMEDIATE): una
+        # transacción diferida que después escribe falla con "database is
+        # locked" sin esperar si otra terminal escribió entretanto. Las de
+        # solo lectura pueden pedir immediate=False.
+        conn = self.get_connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        
+        self._begin(conn, immediate)
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    
+    def init_database(self):
+        # Arranque rápido: una base ya actualizada no necesita ningún paso más
+        if self.schema_version() >= self.SCHEMA_VERSION:
+            return
+        
+        with self.transaction(immediate=True) as conn:
+            self._create_schema(conn.cursor())
+        
+        # Crear usuario administrador por defecto
+        self.create_default_admin()
+        self.create_default_categories()
+        
+        # Actualizar bases existentes a la última versión del esquema
+        self.migrate()
+    
+    def checkpoint(self, mode="PASSIVE"):
+        # Traslada el WAL a la base. PASSIVE no espera a nadie (lo llama el
+        # escritor de ventas cuando está ocioso); TRUNCATE además vacía el
+        # archivo -wal si ninguna terminal está leyendo.
+        # Devuelve (bloqueado, páginas en el WAL, páginas trasladadas)
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Modo de checkpoint inválido: {mode}")
+        return tuple(self.get_connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+    
+    def schema_version(self):
+        return self.get_connection().execute("PRAGMA user_version").fetchone()[0]
+    
+    def migrate(self):
+        # Aplica en orden las migraciones pendientes, cada una en su propia
+        # transacción junto con el nuevo número de versión
+        for version, steps in self.MIGRATIONS:
+            if version <= self.schema_version():
+                continue
+            
+            with self.transaction(immediate=True) as conn:
+                # Otra terminal pudo aplicarla mientras esperábamos el bloqueo
+                if version <= self.schema_version():
+                    continue
+                
+                cursor = conn.cursor()
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute(f"PRAGMA user_version = {int(version)}")
+    
+    def _create_schema(self, cursor):
+        # Tabla de usuarios
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usuarios (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                nombre TEXT NOT NULL,
+                rol TEXT NOT NULL,
+                activo INTEGER DEFAULT 1,
+                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Tabla de categorías
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS categorias (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nombre TEXT UNIQUE NOT NULL,
+                descripcion TEXT,
+                activa INTEGER DEFAULT 1
+            )
+        ''')
+        
+        # Tabla de productos
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS productos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                codigo TEXT UNIQUE NOT NULL,
+                nombre TEXT NOT NULL,
+                descripcion TEXT,
+                categoria_id INTEGER,
+                precio_venta REAL NOT NULL,
+                precio_compra REAL,
+                stock INTEGER DEFAULT 0,
+                stock_minimo INTEGER DEFAULT 0,
+                activo INTEGER DEFAULT 1,
+                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (categoria_id) REFERENCES categorias (id)
+            )
+        ''')
+        
+        # Tabla de ventas
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ventas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                numero_factura TEXT UNIQUE NOT NULL,
+                usuario_id INTEGER NOT NULL,
+                total REAL NOT NULL,
+                descuento REAL DEFAULT 0,
+                impuesto REAL DEFAULT 0,
+                fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                estado TEXT DEFAULT 'completada',
+                FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
+            )
+        ''')
+        
+        # Tabla de detalles de venta
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS detalle_ventas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                venta_id INTEGER NOT NULL,
+                producto_id INTEGER NOT NULL,
+                cantidad INTEGER NOT NULL,
+                precio_unitario REAL NOT NULL,
+                subtotal REAL NOT NULL,
+                FOREIGN KEY (venta_id) REFERENCES ventas (id),
+                FOREIGN KEY (producto_id) REFERENCES productos (id)
+            )
+        ''')
+        
+        # Tabla de movimientos de inventario
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS movimientos_inventario (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                producto_id INTEGER NOT NULL,
+                tipo_movimiento TEXT NOT NULL,
+                cantidad INTEGER NOT NULL,
+                motivo TEXT,
+                usuario_id INTEGER,
+                fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (producto_id) REFERENCES productos (id),
+                FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
+            )
+        ''')
+    
+    def create_default_admin(self):
+        with self.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            
+            # Verificar si ya existe un admin
+            cursor.execute("SELECT COUNT(*) FROM usuarios WHERE rol = 'admin'")
+            if cursor.fetchone()[0] == 0:
+                password_hash = hashlib.sha256("admin123".encode()).hexdigest()
+                cursor.execute('''
+                    INSERT INTO usuarios (username, password, nombre, rol)
+                    VALUES (?, ?, ?, ?)
+                ''', ("admin", password_hash, "Administrador", "admin"))
+    
+    def create_default_categories(self):
+        default_categories = [
+            ("General", "Productos generales"),
+            ("Electrónicos", "Dispositivos electrónicos"),
+            ("Ropa", "Vestimenta y accesorios"),
+            ("Alimentos", "Productos alimenticios"),
+            ("Hogar", "Artículos para el hogar")
+        ]
+        
+        with self.transaction(immediate=True) as conn:
+            conn.executemany('''
+                INSERT OR IGNORE INTO categorias (nombre, descripcion)
+                VALUES (?, ?)
+            ''', default_categories)
+    
+    def hash_password(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+    
+    def authenticate_user(self, username, password):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        password_hash = self.hash_password(password)
+        cursor.execute('''
+            SELECT id, username, nombre, rol FROM usuarios 
+            WHERE username = ? AND password = ? AND activo = 1
+        ''', (username, password_hash))
+        
+        return cursor.fetchone()
+    
+    def has_product_fts(self):
+        if self._has_product_fts is None:
+            self._has_product_fts = self.get_connection().execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'productos_fts'"
+            ).fetchone() is not None
+        return self._has_product_fts
+    
+    def product_search_sql(self, search_term):
+        # Fragmentos (from, where, order by, parámetros) para buscar productos
+        # por texto con alias p. Usa el índice FTS5 ordenado por relevancia
+        # cuando existe y el término es suficientemente largo; si no, LIKE.
+        if self.has_product_fts() and len(search_term) >= self.FTS_MIN_TERM_LENGTH:
+            # Frase entre comillas: coincidencia de subcadena, igual que LIKE
+            phrase = '"' + search_term.replace('"', '""') + '"'
+            return ("productos_fts f JOIN productos p ON p.id = f.rowid",
+                    "productos_fts MATCH ?",
+                    "bm25(productos_fts, 10.0, 5.0, 1.0), p.nombre",
+                    [phrase])
+        
+        pattern = f"%{search_term}%"
+        return ("productos p",
+                "(p.codigo LIKE ? OR p.nombre LIKE ? OR p.descripcion LIKE ?)",
+                "p.nombre",
+                [pattern, pattern, pattern])
+    
+    def get_products(self, search_term="", limit=SEARCH_LIMIT):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        if search_term:
+            from_sql, where_sql, order_sql, params = self.product_search_sql(search_term)
+            cursor.execute(f'''
+                SELECT p.id, p.codigo, p.nombre, p.descripcion, c.nombre as categoria,
+                       p.precio_venta, p.stock, p.stock_minimo
+                FROM {from_sql}
+                LEFT JOIN categorias c ON p.categoria_id = c.id
+                WHERE p.activo = 1 AND {where_sql}
+                ORDER BY {order_sql}
+                LIMIT ?
+            ''', params + [limit])
+        else:
+            # Cambios confirmados por otras terminales durante la lectura
+            # cuentan como posteriores a la carga
+            counter = self._catalog_counter(cursor)
+            cursor.execute('''
+                SELECT p.id, p.codigo, p.nombre, p.descripcion, c.nombre as categoria,
+                       p.precio_venta, p.stock, p.stock_minimo
+                FROM productos p
+                LEFT JOIN categorias c ON p.categoria_id = c.id
+                WHERE p.activo = 1
+                ORDER BY p.nombre
+            ''')
+            
+            # El listado completo recarga también el catálogo en memoria
+            products = cursor.fetchall()
+            self.catalog.load(products)
+            with self._catalog_lock:
+                self._catalog_synced = counter
+            return products
+        
+        return cursor.fetchall()
+    
+    def _fetch_product(self, condition, value):
+        # Lee un producto activo de la base y lo incorpora al catálogo
+        cursor = self.get_connection().cursor()
+        cursor.execute(f'''
+            SELECT p.id, p.codigo, p.nombre, p.descripcion, c.nombre as categoria,
+                   p.precio_venta, p.stock, p.stock_minimo
+            FROM productos p
+            LEFT JOIN categorias c ON p.categoria_id = c.id
+            WHERE {condition} AND p.activo = 1
+        ''', (value,))
+        
+        row = cursor.fetchone()
+        return self.catalog.put(row) if row else None
+    
+    @staticmethod
+    def _catalog_counter(cursor):
+        cursor.execute("SELECT valor FROM secuencias WHERE nombre = 'catalogo'")
+        return cursor.fetchone()[0]
+    
+    def _catalog_written(self, before, after):
+        # Escritura propia (contador de before a after dentro de la misma
+        # transacción) ya parcheada en el catálogo: si la caché estaba al día
+        # antes de ella, lo sigue estando
+        with self._catalog_lock:
+            if self._catalog_synced == before:
+                self._catalog_synced = after
+    
+    def catalog_stale(self):
+        # True si otra terminal cambió productos desde que la caché está al
+        # día. Las escrituras propias que parchean el catálogo no cuentan
+        now = time.monotonic()
+        if self._catalog_checked is None or now - self._catalog_checked >= self.CATALOG_CHECK_INTERVAL:
+            self._catalog_seen = self._catalog_counter(self.get_connection().cursor())
+            self._catalog_checked = now
+        synced = self._catalog_synced
+        return synced is None or self._catalog_seen > synced
+    
+    def catalog_outdated(self):
+        # Recarga completa para los listados: catálogo sin cargar, o con
+        # cambios de otras terminales y cargado hace más de CATALOG_MAX_AGE
+        if not self.catalog.loaded:
+            return True
+        return time.monotonic() - self.catalog.loaded_at > self.CATALOG_MAX_AGE and self.catalog_stale()
+    
+    def get_product_by_code(self, codigo, fresh=False):
+        # fresh: precio y stock al día aunque otra terminal los haya cambiado
+        # (agregar al carrito). Solo se lee la base si hubo cambios externos
+        if not self.catalog.loaded:
+            self.get_products()
+        elif fresh and self.catalog_stale():
+            product = self._fetch_product("p.codigo = ?", codigo)
+            if product is None:
+                cached = self.catalog.by_code(codigo)
+                if cached is not None:
+                    self.catalog.discard(cached.id)
+            return product
+        
+        # Un producto que no está en caché pudo crearlo otra terminal
+        return self.catalog.by_code(codigo) or self._fetch_product("p.codigo = ?", codigo)
+    
+    def get_product_by_id(self, producto_id, fresh=False):
+        if not self.catalog.loaded:
+            self.get_products()
+        elif fresh and self.catalog_stale():
+            product = self._fetch_product("p.id = ?", producto_id)
+            if product is None:
+                self.catalog.discard(producto_id)
+            return product
+        
+        return self.catalog.by_id(producto_id) or self._fetch_product("p.id = ?", producto_id)
+    
+    def refresh_product(self, producto_id):
+        # Sincroniza un producto del catálogo después de editarlo o eliminarlo
+        if self._fetch_product("p.id = ?", producto_id) is None:
+            self.catalog.discard(producto_id)
+    
+    def invalidate_catalog(self):
+        self.catalog.invalidate()
+    
+    def _read_stock(self, cursor, product_ids):
+        cursor.execute('''
+            SELECT id, stock FROM productos WHERE id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(list(product_ids)),))
+        return cursor.fetchall()
+    
+    def update_stock(self, producto_id, cantidad, tipo_movimiento, usuario_id, motivo=""):
+        self.apply_stock_movements([(producto_id, tipo_movimiento, cantidad, motivo)], usuario_id)
+    
+    def apply_stock_movements(self, movements, usuario_id):
+        # movements: lista de (producto_id, tipo_movimiento, cantidad, motivo).
+        # Todos se registran en una única transacción: o entran todos o ninguno
+        deltas = []
+        for producto_id, tipo_movimiento, cantidad, motivo in movements:
+            if tipo_movimiento not in ("entrada", "salida"):
+                raise ValueError(f"Tipo de movimiento inválido: {tipo_movimiento}")
+            if cantidad <= 0:
+                raise ValueError("La cantidad debe ser mayor a 0")
+            deltas.append((producto_id, cantidad if tipo_movimiento == "entrada" else -cantidad))
+        if not deltas:
+            return
+        
+        with self.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            first_movement = self._last_movement_id(cursor)
+            counter = self._catalog_counter(cursor)
+            
+            # Registrar movimientos en lote
+            cursor.executemany('''
+                INSERT INTO movimientos_inventario (producto_id, tipo_movimiento, cantidad, motivo, usuario_id)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(producto_id, tipo_movimiento, cantidad, motivo, usuario_id)
+                  for producto_id, tipo_movimiento, cantidad, motivo in movements])
+            
+            # Actualizar el stock de todos los productos en una sola sentencia
+            self._apply_stock_deltas(cursor, deltas)
+            
+            cursor.execute(f'''
+                INSERT INTO replicacion (tipo, datos)
+                SELECT 'movimientos', json_object('movimientos', json({self.REPLICATION_MOVEMENTS}))
+                WHERE {self.REPLICATION_ENABLED}
+            ''', (first_movement,))
+            
+            stocks = self._read_stock(cursor, {producto_id for producto_id, _ in deltas})
+            written = self._catalog_counter(cursor)
+        
+        # Parchear la caché solo cuando la escritura ya está confirmada
+        self.catalog.update_stock(stocks)
+        self._catalog_written(counter, written)
+    
+    def _last_movement_id(self, cursor):
+        # Dentro de una transacción de escritura, los movimientos con id mayor
+        # son los que registra esa misma transacción
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM movimientos_inventario")
+        return cursor.fetchone()[0]
+    
+    def _apply_stock_deltas(self, cursor, deltas):
+        # Aplica en una sola sentencia una lista de (producto_id, delta);
+        # los productos repetidos se agregan dentro de SQLite
+        cursor.execute('''
+            UPDATE productos SET stock = stock + d.delta
+            FROM (SELECT json_extract(value, '$[0]') AS producto_id,
+                         SUM(json_extract(value, '$[1]')) AS delta
+                  FROM json_each(?)
+                  GROUP BY 1) AS d
+            WHERE productos.id = d.producto_id
+        ''', (json.dumps(deltas),))
+    
+    def next_invoice_number(self, cursor):
+        # Toma el siguiente valor de la secuencia dentro de la transacción de
+        # la venta. La escritura bloquea a las demás terminales hasta el commit,
+        # así que dos ventas nunca reciben el mismo número, y si la venta se
+        # revierte el número vuelve a quedar libre. Formato: FAC-AAAAMMDD-NNNNNNNN
+        cursor.execute('''
+            UPDATE secuencias SET valor = valor + 1 WHERE nombre = 'factura' RETURNING valor
+        ''')
+        valor = cursor.fetchone()[0]
+        return f"FAC-{datetime.now().strftime('%Y%m%d')}-{valor:08d}"
+    
+    def create_sale(self, usuario_id, items, descuento=0, impuesto=0, uid=None):
+        # items: un Cart o cualquier iterable de líneas con producto_id,
+        # nombre, precio, cantidad y subtotal
+        # Calcular total
+        total = sum(item['subtotal'] for item in items)
+        total_final = total - descuento + impuesto
+        
+        # Toda la venta (cabecera, detalles, movimientos y stock) se confirma
+        # en una única transacción: o se registra completa o no se registra
+        with self.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            
+            # Una venta reintentada que ya se registró no se duplica
+            if uid is not None:
+                cursor.execute("SELECT numero_factura, total FROM ventas WHERE uid = ?", (uid,))
+                existing = cursor.fetchone()
+                if existing:
+                    return existing
+            
+            # Generar número de factura
+            numero_factura = self.next_invoice_number(cursor)
+            motivo = f"Venta {numero_factura}"
+            first_movement = self._last_movement_id(cursor)
+            counter = self._catalog_counter(cursor)
+            
+            # Crear venta
+            cursor.execute('''
+                INSERT INTO ventas (numero_factura, usuario_id, total, descuento, impuesto, uid)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (numero_factura, usuario_id, total_final, descuento, impuesto, uid))
+            
+            venta_id = cursor.lastrowid
+            
+            # Sumar la venta a los acumulados de su día y cajero
+            cursor.execute('''
+                INSERT INTO ventas_diarias (fecha, usuario_id, ventas, bruto, descuento, neto)
+                SELECT date(fecha), usuario_id, 1, total, descuento, total - descuento
+                FROM ventas WHERE id = ?
+                ON CONFLICT (fecha, usuario_id) DO UPDATE SET
+                    ventas = ventas + excluded.ventas,
+                    bruto = bruto + excluded.bruto,
+                    descuento = descuento + excluded.descuento,
+                    neto = neto + excluded.neto
+            ''', (venta_id,))
+            
+            # Crear detalles de venta en lote
+            cursor.executemany('''
+                INSERT INTO detalle_ventas (venta_id, producto_id, cantidad, precio_unitario, subtotal)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(venta_id, item['producto_id'], item['cantidad'], item['precio'], item['subtotal'])
+                  for item in items])
+            
+            # Sumar las líneas a los contadores por producto del día
+            cursor.execute('''
+                INSERT INTO ventas_producto_diarias (fecha, producto_id, cantidad, total, precio_suma, lineas)
+                SELECT date(v.fecha), dv.producto_id, SUM(dv.cantidad), SUM(dv.subtotal),
+                       SUM(dv.precio_unitario), COUNT(*)
+                FROM detalle_ventas dv
+                JOIN ventas v ON dv.venta_id = v.id
+                WHERE dv.venta_id = ?
+                GROUP BY dv.producto_id
+                ON CONFLICT (fecha, producto_id) DO UPDATE SET
+                    cantidad = cantidad + excluded.cantidad,
+                    total = total + excluded.total,
+                    precio_suma = precio_suma + excluded.precio_suma,
+                    lineas = lineas + excluded.lineas
+            ''', (venta_id,))
+            
+            # Registrar movimientos de inventario en lote
+            cursor.executemany('''
+                INSERT INTO movimientos_inventario (producto_id, tipo_movimiento, cantidad, motivo, usuario_id)
+                VALUES (?, 'salida', ?, ?, ?)
+            ''', [(item['producto_id'], item['cantidad'], motivo, usuario_id) for item in items])
+            
+            # Descontar stock de todos los productos en una sola sentencia
+            self._apply_stock_deltas(cursor, [(item['producto_id'], -item['cantidad']) for item in items])
+            
+            # La venta completa, con sus líneas y movimientos, al registro de
+            # replicación
+            cursor.execute(f'''
+                INSERT INTO replicacion (tipo, datos)
+                SELECT 'venta', json_object(
+                    'numero_factura', v.numero_factura, 'uid', v.uid, 'usuario_id', v.usuario_id,
+                    'total', v.total, 'descuento', v.descuento, 'impuesto', v.impuesto, 'fecha', v.fecha,
+                    'items', json((SELECT json_group_array(json_object(
+                                       'producto_id', dv.producto_id, 'codigo', p.codigo, 'cantidad', dv.cantidad,
+                                       'precio', dv.precio_unitario, 'subtotal', dv.subtotal))
+                                   FROM detalle_ventas dv JOIN productos p ON p.id = dv.producto_id
+                                   WHERE dv.venta_id = v.id)),
+                    'movimientos', json({self.REPLICATION_MOVEMENTS}))
+                FROM ventas v WHERE v.id = ? AND {self.REPLICATION_ENABLED}
+            ''', (first_movement, venta_id))
+            
+            stocks = self._read_stock(cursor, {item['producto_id'] for item in items})
+            written = self._catalog_counter(cursor)
+        
+        self.catalog.update_stock(stocks)
+        self._catalog_written(counter, written)
+        return numero_factura, total_final
+    
+    def enable_replication(self):
+        # Desde ahora cada venta y lote de movimientos entra al registro
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT OR IGNORE INTO configuracion (clave, valor) VALUES ('replicacion', CURRENT_TIMESTAMP)
+            ''')
+    
+    def disable_replication(self):
+        # Deja de registrar y descarta lo que no se llegó a enviar
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM configuracion WHERE clave = 'replicacion'")
+            cursor = conn.execute("DELETE FROM replicacion")
+            return cursor.rowcount
+    
+    def prune_replication_log(self, days):
+        # Borra los registros ya confirmados por la central con más de days
+        # días; devuelve cuántos se borraron
+        with self.transaction() as conn:
+            cursor = conn.execute('''
+                DELETE FROM replicacion
+                WHERE seq <= (SELECT valor FROM secuencias WHERE nombre = 'replicacion')
+                  AND fecha < datetime('now', ?)
+            ''', (f"-{int(days)} days",))
+            return cursor.rowcount
+    
+    def get_sales_summary(self, start_date, end_date=None):
+        # (ventas, bruto, descuento, neto) de los días [start_date, end_date]
+        # leídos de los acumulados diarios
+        end_date = end_date or start_date
+        return self.get_connection().execute('''
+            SELECT COALESCE(SUM(ventas), 0), COALESCE(SUM(bruto), 0),
+                   COALESCE(SUM(descuento), 0), COALESCE(SUM(neto), 0)
+            FROM ventas_diarias
+            WHERE fecha >= ? AND fecha <= ?
+        ''', (start_date.isoformat(), end_date.isoformat())).fetchone()
+    
+    def get_top_products(self, start_date, end_date, limit):
+        # Productos más vendidos en [start_date, end_date] desde los contadores
+        # diarios: (nombre, codigo, cantidad, total, precio_promedio). Los
+        # empates de cantidad se ordenan por id, igual que get_top_products_raw
+        return self.get_connection().execute('''
+            SELECT p.nombre, p.codigo, SUM(r.cantidad) AS total_cantidad,
+                   SUM(r.total) AS total_vendido,
+                   SUM(r.precio_suma) / SUM(r.lineas) AS precio_promedio
+            FROM ventas_producto_diarias r
+            JOIN productos p ON r.producto_id = p.id
+            WHERE r.fecha >= ? AND r.fecha <= ?
+            GROUP BY p.id
+            ORDER BY total_cantidad DESC, p.id
+            LIMIT ?
+        ''', (start_date.isoformat(), end_date.isoformat(), limit)).fetchall()
+    
+    def get_top_products_raw(self, start_date, end_date, limit):
+        # La misma consulta sobre el detalle de ventas; sirve para verificar los contadores
+        return self.get_connection().execute('''
+            SELECT p.nombre, p.codigo, SUM(dv.cantidad) AS total_cantidad,
+                   SUM(dv.subtotal) AS total_vendido,
+                   AVG(dv.precio_unitario) AS precio_promedio
+            FROM detalle_ventas dv
+            JOIN productos p ON dv.producto_id = p.id
+            JOIN ventas v ON dv.venta_id = v.id
+            WHERE v.fecha >= ? AND v.fecha < ?
+            GROUP BY p.id
+            ORDER BY total_cantidad DESC, p.id
+            LIMIT ?
+        ''', (*date_range(start_date, end_date), limit)).fetchall()
+    
+    def rebuild_sales_rollups(self):
+        # Recalcula los acumulados desde el historial (p. ej. tras corregir ventas a mano)
+        with self.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            rebuild_daily_sales(cursor)
+            rebuild_daily_product_sales(cursor)
@@ -0,0 +1,154 @@
+import queue
+import sqlite3
+import threading
+
+class LiveSearch:
+    """Búsqueda en vivo de productos fuera del hilo de Tk.
+
+    schedule() espera a que el usuario deje de escribir (debounce) y start()
+    lanza la búsqueda en un hilo de trabajo con su propia conexión. Cada
+    búsqueda nueva reemplaza a la anterior: la consulta en curso se
+    interrumpe y su resultado se descarta. Si el término nuevo contiene al
+    de la última búsqueda y ese resultado estaba completo (no llegó al
+    límite), se filtra en memoria sin volver a consultar la base.
+    """
+
+    DELAY_MS = 250
+    POLL_MS = 30
+
+    def __init__(self, widget, db, search, fields, on_results, limit, delay_ms=DELAY_MS):
+        # search(term) -> filas, se ejecuta en el hilo de trabajo
+        # fields(fila) -> textos donde buscar el término al filtrar en memoria
+        # on_results(term, filas) se llama en el hilo de Tk
+        self.widget = widget
+        self.db = db
+        self.search = search
+        self.fields = fields
+        self.on_results = on_results
+        self.limit = limit
+        self.delay_ms = delay_ms
+
+        self.generation = 0
+        self.last_term = None
+        self.last_results = None
+        self._after_id = None
+        self._polling = False
+        # La búsqueda actual espera resultado del hilo de trabajo
+        self._waiting = False
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        # Conexión del hilo de trabajo mientras ejecuta una consulta
+        self._running_conn = None
+        self._running_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="live-search", daemon=True)
+        self._thread.start()
+
+    def schedule(self, term):
+        # Llamado en cada tecla: solo se busca tras delay_ms sin cambios
+        self._cancel_timer()
+        self._after_id = self.widget.after(self.delay_ms, self.start, term)
+
+    def start(self, term):
+        self._cancel_timer()
+        self.generation += 1
+        self._interrupt()
+
+        refined = self._refine(term)
+        if refined is not None:
+            self._deliver(term, refined)
+            return
+
+        self._requests.put((self.generation, term))
+        self._waiting = True
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.POLL_MS, self._poll)
+
+    def cancel(self):
+        # Descarta la búsqueda pendiente o en curso (p. ej. al vaciar el campo)
+        self._cancel_timer()
+        self.generation += 1
+        self._waiting = False
+        self._interrupt()
+
+    def reset(self):
+        # Los datos cambiaron: el último resultado ya no sirve para filtrar
+        self.cancel()
+        self.last_term = None
+        self.last_results = None
+
+    def close(self):
+        # Puede llamarse con la ventana ya destruida: no toca los temporizadores
+        self.generation += 1
+        self._interrupt()
+        self._requests.put(None)
+
+    def _refine(self, term):
+        if self.last_results is None or len(self.last_results) >= self.limit:
+            return None
+        needle = term.lower()
+        if self.last_term.lower() not in needle:
+            return None
+        return [row for row in self.last_results
+                if any(needle in (text or "").lower() for text in self.fields(row))]
+
+    def _deliver(self, term, rows):
+        self.last_term = term
+        self.last_results = rows
+        self.on_results(term, rows)
+
+    def _cancel_timer(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _interrupt(self):
+        with self._running_lock:
+            if self._running_conn is not None:
+                self._running_conn.interrupt()
+
+    def _poll(self):
+        # Resultados del hilo de trabajo; los de búsquedas reemplazadas se ignoran
+        while True:
+            try:
+                generation, term, rows = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation:
+                self._waiting = False
+                # rows es None si la consulta falló: se mantiene la lista actual
+                if rows is not None:
+                    self._deliver(term, rows)
+
+        if self._waiting:
+            self.widget.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            # Solo interesa la última búsqueda pedida
+            while request is not None and not self._requests.empty():
+                request = self._requests.get_nowait()
+            if request is None:
+                break
+
+            generation, term = request
+            if generation != self.generation:
+                continue
+
+            with self._running_lock:
+                self._running_conn = self.db.get_connection()
+            try:
+                rows = self.search(term)
+            except sqlite3.Error:
+                # Interrumpida por una búsqueda más nueva (o fallida)
+                rows = None
+            finally:
+                with self._running_lock:
+                    self._running_conn = None
+
+            self._results.put((generation, term, rows))
+
+        self.db.release_connection()
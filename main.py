@@ -1,36 +1,112 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-Sistema de Punto de Venta (POS)
-Archivo principal de ejecución
-"""
-
-import sys
-import os
-from login import LoginWindow
-from pos_main import POSMain
-
-def main():
-    """Función principal del sistema POS"""
-    try:
-        # Mostrar ventana de login
-        login_window = LoginWindow()
-        user = login_window.run()
-        
-        # Si el usuario se autenticó correctamente, abrir el sistema principal
-        if user:
-            print(f"Usuario autenticado: {user['nombre']} ({user['rol']})")
-            pos_system = POSMain(user)
-            pos_system.run()
-        else:
-            print("Sesión cancelada por el usuario")
-            
-    except Exception as e:
-        print(f"Error al ejecutar el sistema: {str(e)}")
-        input("Presione Enter para salir...")
-        sys.exit(1)
-
-if __name__ == "__main__":
-    main()
-
-
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sistema de Punto de Venta (POS)
+Archivo principal de ejecución
+"""
+
+import time
+_START_TIME = time.perf_counter()
+
+import argparse
+import sys
+import os
+from database import Database
+from login import LoginWindow
+
+class StartupProfiler:
+    """Mide la duración de cada etapa del arranque (--profile-startup)"""
+
+    def __init__(self, enabled, start_time):
+        self.enabled = enabled
+        self.last = start_time
+        self.steps = []
+
+    def mark(self, label, interactive=False):
+        now = time.perf_counter()
+        self.steps.append((label, now - self.last, interactive))
+        self.last = now
+
+    def report(self):
+        if not self.enabled:
+            return
+
+        print("Perfil de arranque:")
+        for label, seconds, interactive in self.steps:
+            suffix = " (no cuenta: espera del usuario)" if interactive else ""
+            print(f"  {label:<32} {seconds * 1000:9.1f} ms{suffix}")
+        total = sum(seconds for _, seconds, interactive in self.steps if not interactive)
+        print(f"  {'Total':<32} {total * 1000:9.1f} ms")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sistema de Punto de Venta")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="mostrar el tiempo de cada etapa del arranque")
+    parser.add_argument('--trace', nargs='?', const="trazas_ventas.jsonl", metavar='ARCHIVO',
+                        help="registrar las etapas de cada venta en un archivo JSONL "
+                             "(por defecto trazas_ventas.jsonl; resumen con tracing.py)")
+    parser.add_argument('--watchdog', nargs='?', const="bloqueos_ui.jsonl", metavar='ARCHIVO',
+                        help="registrar los bloqueos de la interfaz con la pila que los causó "
+                             "(por defecto bloqueos_ui.jsonl; ranking con ui_watchdog.py)")
+    parser.add_argument('--replicate', metavar='URL',
+                        help="enviar ventas y movimientos a la base central (replication_server.py); "
+                             "con varias terminales sobre la misma base, usar replication.py aparte")
+    parser.add_argument('--terminal', metavar='NOMBRE',
+                        help="nombre de esta caja para su diario de ventas pendientes (por defecto el "
+                             "nombre del equipo); distinto en cada caja que corre en un mismo equipo")
+    return parser.parse_args()
+
+def main():
+    """Función principal del sistema POS"""
+    args = parse_args()
+    profiler = StartupProfiler(args.profile_startup, _START_TIME)
+    profiler.mark("Importación de módulos")
+
+    try:
+        # Una sola base compartida por el login y la ventana principal
+        with Database() as db:
+            profiler.mark("Apertura de la base de datos")
+
+            # Mostrar ventana de login
+            login_window = LoginWindow(db)
+            profiler.mark("Ventana de inicio de sesión")
+            user = login_window.run()
+            profiler.mark("Inicio de sesión", interactive=True)
+
+            # Si el usuario se autenticó correctamente, abrir el sistema principal
+            if user:
+                print(f"Usuario autenticado: {user['nombre']} ({user['rol']})")
+                # La ventana principal se importa después del login
+                from pos_main import POSMain
+                from tracing import NULL_TRACER, Tracer
+                tracer = Tracer(args.trace) if args.trace else NULL_TRACER
+                pos_system = POSMain(user, db, tracer, args.terminal)
+                watchdog = None
+                if args.watchdog:
+                    from ui_watchdog import UIWatchdog
+                    watchdog = UIWatchdog(pos_system.root, args.watchdog).start()
+                shipper = None
+                if args.replicate:
+                    from replication import ReplicationShipper
+                    shipper = ReplicationShipper(db, args.replicate).start()
+                profiler.mark("Ventana principal")
+                profiler.report()
+                try:
+                    pos_system.run()
+                finally:
+                    if watchdog is not None:
+                        watchdog.stop()
+                    if shipper is not None:
+                        shipper.stop()
+                    tracer.close()
+            else:
+                print("Sesión cancelada por el usuario")
+                profiler.report()
+
+    except Exception as e:
+        print(f"Error al ejecutar el sistema: {str(e)}")
+        input("Presione Enter para salir...")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
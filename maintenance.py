@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tareas de mantenimiento de la base de datos del POS
+
+Uso:
+    python maintenance.py rebuild-rollups [--db pos_system.db]
+    python maintenance.py verify-rollups [--db pos_system.db] [--top 50]
+    python maintenance.py checkpoint [--db pos_system.db]
+    python maintenance.py prune-replication [--db pos_system.db] [--days 30]
+    python maintenance.py disable-replication [--db pos_system.db]
+
+verify-rollups termina con código 1 si los acumulados no coinciden con el
+historial de ventas.
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+from database import Database
+
+# Los importes acumulados se suman en otro orden que en el historial:
+# se comparan al centavo
+AMOUNT_TOLERANCE = 0.005
+
+def rebuild_rollups(db, args):
+    start = time.perf_counter()
+    db.rebuild_sales_rollups()
+    days = db.get_connection().execute("SELECT COUNT(DISTINCT fecha) FROM ventas_diarias").fetchone()[0]
+    print(f"Acumulados de ventas recalculados: {days} días en {time.perf_counter() - start:.1f} s")
+    return 0
+
+def compare_rows(label, rollup, raw, exact_columns):
+    # rollup y raw: {clave: fila de valores}; las primeras exact_columns
+    # columnas son conteos y deben coincidir exactamente
+    errors = []
+    for key in sorted(rollup.keys() | raw.keys()):
+        stored = rollup.get(key)
+        expected = raw.get(key)
+        if stored is None or expected is None:
+            errors.append(f"{label} {key}: acumulado {stored}, historial {expected}")
+        elif (stored[:exact_columns] != expected[:exact_columns]
+              or any(abs(a - b) > AMOUNT_TOLERANCE
+                     for a, b in zip(stored[exact_columns:], expected[exact_columns:]))):
+            errors.append(f"{label} {key}: acumulado {stored}, historial {expected}")
+    return errors
+
+def verify_rollups(db, args):
+    conn = db.get_connection()
+    errors = []
+
+    rollup = {(fecha, usuario_id): values for fecha, usuario_id, *values in conn.execute(
+        "SELECT fecha, usuario_id, ventas, bruto, descuento, neto FROM ventas_diarias")}
+    raw = {(fecha, usuario_id): values for fecha, usuario_id, *values in conn.execute('''
+        SELECT date(fecha), usuario_id, COUNT(*), SUM(total), SUM(descuento), SUM(total - descuento)
+        FROM ventas GROUP BY date(fecha), usuario_id
+    ''')}
+    errors += compare_rows("Ventas del día", rollup, raw, exact_columns=1)
+
+    rollup = {(fecha, producto_id): values for fecha, producto_id, *values in conn.execute(
+        "SELECT fecha, producto_id, cantidad, lineas, total, precio_suma FROM ventas_producto_diarias")}
+    raw = {(fecha, producto_id): values for fecha, producto_id, *values in conn.execute('''
+        SELECT date(v.fecha), dv.producto_id, SUM(dv.cantidad), COUNT(*),
+               SUM(dv.subtotal), SUM(dv.precio_unitario)
+        FROM detalle_ventas dv JOIN ventas v ON dv.venta_id = v.id
+        GROUP BY date(v.fecha), dv.producto_id
+    ''')}
+    errors += compare_rows("Producto por día", rollup, raw, exact_columns=2)
+
+    # El top de productos desde los contadores debe ser el mismo que el de la
+    # consulta sobre el detalle, para todo el historial y períodos recientes
+    first, last = conn.execute("SELECT MIN(date(fecha)), MAX(date(fecha)) FROM ventas").fetchone()
+    today = date.today()
+    ranges = [(today - timedelta(days=7), today), (today - timedelta(days=30), today)]
+    if first:
+        ranges.append((date.fromisoformat(first), date.fromisoformat(last)))
+    for start_date, end_date in ranges:
+        fast = db.get_top_products(start_date, end_date, args.top)
+        slow = db.get_top_products_raw(start_date, end_date, args.top)
+        same = len(fast) == len(slow) and all(
+            a[:3] == b[:3] and all(abs(x - y) <= AMOUNT_TOLERANCE for x, y in zip(a[3:], b[3:]))
+            for a, b in zip(fast, slow))
+        if not same:
+            errors.append(f"Top {args.top} del {start_date} al {end_date} no coincide con el historial")
+
+    for error in errors[:50]:
+        print(error)
+    if len(errors) > 50:
+        print(f"... y {len(errors) - 50} diferencias más")
+    print("Acumulados correctos" if not errors else f"{len(errors)} diferencias encontradas")
+    return 1 if errors else 0
+
+def checkpoint(db, args):
+    # Traslada el WAL completo a la base y lo vacía (p. ej. antes de copiarla)
+    busy, wal_pages, moved = db.checkpoint("TRUNCATE")
+    if busy:
+        print(f"Checkpoint incompleto: hay terminales usando la base ({moved} de {wal_pages} páginas)")
+        return 1
+    print(f"Checkpoint completo: {moved} páginas trasladadas")
+    return 0
+
+def prune_replication(db, args):
+    # Registros de replicación ya confirmados por la central
+    deleted = db.prune_replication_log(args.days)
+    print(f"{deleted} registros de replicación confirmados borrados")
+    return 0
+
+def disable_replication(db, args):
+    deleted = db.disable_replication()
+    print(f"Replicación desactivada: {deleted} registros descartados")
+    return 0
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--db', default="pos_system.db", help="base de datos del POS")
+    parser = argparse.ArgumentParser(description="Mantenimiento del sistema POS")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    command = subparsers.add_parser('rebuild-rollups', parents=[common],
+                                    help="recalcular los acumulados de ventas desde el historial")
+    command.set_defaults(handler=rebuild_rollups)
+
+    command = subparsers.add_parser('verify-rollups', parents=[common],
+                                    help="comparar los acumulados con el historial de ventas")
+    command.add_argument('--top', type=int, default=50, help="productos del top a comparar")
+    command.set_defaults(handler=verify_rollups)
+
+    command = subparsers.add_parser('checkpoint', parents=[common],
+                                    help="trasladar el WAL a la base y vaciar el archivo -wal")
+    command.set_defaults(handler=checkpoint)
+
+    command = subparsers.add_parser('prune-replication', parents=[common],
+                                    help="borrar registros de replicación ya confirmados por la central")
+    command.add_argument('--days', type=int, default=30, help="días de registros confirmados a conservar")
+    command.set_defaults(handler=prune_replication)
+
+    command = subparsers.add_parser('disable-replication', parents=[common],
+                                    help="dejar de registrar ventas para la central y vaciar el registro")
+    command.set_defaults(handler=disable_replication)
+
+    args = parser.parse_args()
+    with Database(args.db) as db:
+        return args.handler(db, args)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
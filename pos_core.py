@@ -0,0 +1,128 @@
+"""
+Lógica de caja del POS sin interfaz gráfica
+
+CheckoutService reúne las reglas de la venta (carga de productos, control de
+stock, descuentos y registro) para que POSMain solo muestre resultados y
+errores, y para poder ejecutarla sin pantalla (benchmarks, pruebas de carga).
+Los errores de negocio se informan con subclases de CheckoutError.
+"""
+
+from collections import namedtuple
+
+from cart import Cart, InsufficientStock
+
+class CheckoutError(Exception):
+    pass
+
+class ProductNotFound(CheckoutError):
+    # Se busca por código (escáner) o por id (lista); el mensaje nombra la
+    # clave usada
+    def __init__(self, codigo=None, producto_id=None):
+        if codigo is None:
+            super().__init__(f"Producto con id {producto_id} no encontrado")
+        else:
+            super().__init__(f"Producto con código {codigo} no encontrado")
+        self.codigo = codigo
+        self.producto_id = producto_id
+
+class OutOfStock(CheckoutError):
+    def __init__(self, nombre, disponible, solicitado):
+        if disponible <= 0:
+            message = f"El producto {nombre} no tiene stock disponible"
+        else:
+            message = f"Stock disponible: {disponible}, solicitado: {solicitado}"
+        super().__init__(message)
+        self.nombre = nombre
+        self.disponible = disponible
+        self.solicitado = solicitado
+
+class EmptyCart(CheckoutError):
+    def __init__(self):
+        super().__init__("El carrito está vacío")
+
+class InvalidDiscount(CheckoutError):
+    pass
+
+class SaleFailed(CheckoutError):
+    pass
+
+# Venta cerrada: numero_factura es None mientras el escritor en segundo plano
+# no la haya registrado (se identifica por uid)
+Receipt = namedtuple('Receipt', ('uid', 'numero_factura', 'items', 'subtotal', 'descuento',
+                                 'impuesto', 'total'))
+
+class CheckoutService:
+    def __init__(self, db, usuario_id, sales_writer=None):
+        # Sin sales_writer cada venta se registra en la base al cerrarla
+        self.db = db
+        self.usuario_id = usuario_id
+        self.sales_writer = sales_writer
+        self.cart = Cart()
+
+    # Al agregar al carrito, precio y stock se leen al día (fresh): otra
+    # terminal pudo cambiarlos desde que el catálogo se cargó
+    def available_stock(self, producto_id):
+        # Stock del catálogo en memoria, que ya descuenta las ventas en cola
+        product = self.db.get_product_by_id(producto_id, fresh=True)
+        return product.stock if product else 0
+
+    def add_by_code(self, codigo, cantidad=1):
+        product = self.db.get_product_by_code(codigo, fresh=True)
+        if not product:
+            raise ProductNotFound(codigo)
+        return self.add(product, cantidad)
+
+    def add_by_id(self, producto_id, cantidad=1):
+        product = self.db.get_product_by_id(producto_id, fresh=True)
+        if not product:
+            raise ProductNotFound(producto_id=producto_id)
+        return self.add(product, cantidad)
+
+    def add(self, product, cantidad=1):
+        if cantidad <= 0:
+            raise CheckoutError("La cantidad debe ser mayor a 0")
+        try:
+            # product viene de get_product_by_*: su stock ya descuenta las
+            # ventas en cola
+            return self.cart.add(product.id, product.nombre, product.precio_venta, cantidad,
+                                 product.stock)
+        except InsufficientStock as e:
+            raise OutOfStock(product.nombre, e.disponible, e.solicitado) from e
+
+    def remove(self, producto_id):
+        return self.cart.remove(producto_id)
+
+    def clear(self):
+        self.cart.clear()
+
+    def apply_discount(self, amount):
+        if not self.cart:
+            raise EmptyCart()
+        try:
+            self.cart.set_discount(amount)
+        except ValueError as e:
+            raise InvalidDiscount(str(e)) from e
+
+    def checkout(self, impuesto=0, trace_id=None):
+        # Cierra la venta del carrito actual y lo deja vacío para la siguiente.
+        # trace_id: traza de la venta para el registro en segundo plano
+        if not self.cart:
+            raise EmptyCart()
+
+        cart = self.cart
+        items = [dict(item) for item in cart]
+        try:
+            if self.sales_writer is not None:
+                uid = self.sales_writer.submit(self.usuario_id, items, cart.discount, impuesto,
+                                               trace_id)
+                numero_factura = None
+                total = cart.total + impuesto
+            else:
+                uid = None
+                numero_factura, total = self.db.create_sale(self.usuario_id, cart, cart.discount, impuesto)
+        except Exception as e:
+            raise SaleFailed(f"Error al procesar la venta: {str(e)}") from e
+
+        receipt = Receipt(uid, numero_factura, items, cart.subtotal, cart.discount, impuesto, total)
+        self.cart = Cart()
+        return receipt
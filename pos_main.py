@@ -1,20 +1,43 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-from database import Database
-from login import UserManagement
-from inventory_management import ProductManagement
-from reports import Reports
-import json
+from database import Database, Product
+from sales_writer import SalesWriter
+from product_list import VirtualProductList
+from live_search import LiveSearch
+from pos_core import CheckoutService, CheckoutError, ProductNotFound, OutOfStock, EmptyCart
+from tracing import NULL_TRACER
 from datetime import datetime
 
+# Las ventanas de gestión y reportes se importan la primera vez que se abren
+# (ver métodos de menú) para no alargar el arranque del POS
+
 class POSMain:
-    def __init__(self, user):
+    def __init__(self, user, db=None, tracer=NULL_TRACER, terminal=None):
         self.user = user
-        self.db = Database()
-        self.cart = []
+        # Trazas por etapa de cada venta (--trace); sale_trace es la venta en curso
+        self.tracer = tracer
+        self.sale_trace = tracer.new_trace()
+        # La base puede compartirse con la ventana de inicio de sesión
+        self.owns_db = db is None
+        self.db = db or Database()
+        # Facturas abiertas esperando su número: uid de la venta -> StringVar
+        self.pending_invoices = {}
+        # Diario de ventas pendientes propio de esta terminal
+        self.sales_writer = SalesWriter(self.db, tracer=self.tracer, terminal=terminal).start()
+        # Reglas de la venta; esta ventana solo muestra resultados y errores
+        self.checkout = CheckoutService(self.db, self.user['id'], self.sales_writer)
         self.setup_ui()
+        # Búsqueda en vivo: con espera entre teclas y fuera del hilo de Tk
+        self.live_search = LiveSearch(self.root, self.db, self.find_products,
+                                      lambda product: (product.codigo, product.nombre, product.descripcion),
+                                      self.show_search_results, self.db.SEARCH_LIMIT)
         self.load_products()
         self.setup_keyboard_shortcuts()
+        self.poll_sales_writer()
+    
+    @property
+    def cart(self):
+        return self.checkout.cart
     
     def setup_ui(self):
         self.root = tk.Tk()
@@ -41,6 +64,25 @@ class POSMain:
         
         # Panel derecho - Carrito y facturación
         self.create_cart_panel(main_frame)
+        
+        # Barra de estado - Cola de ventas
+        self.create_status_bar()
+    
+    def create_status_bar(self):
+        status_frame = tk.Frame(self.root, bg='#bdc3c7')
+        status_frame.grid(row=1, column=0, columnspan=2, sticky='ew')
+        
+        self.sales_queue_label = tk.Label(status_frame, text="Ventas en cola: 0",
+                                         font=('Arial', 9), bg='#bdc3c7', fg='#2c3e50')
+        self.sales_queue_label.pack(side='left', padx=10)
+        
+        self.commit_latency_label = tk.Label(status_frame, text="Último registro: -",
+                                            font=('Arial', 9), bg='#bdc3c7', fg='#2c3e50')
+        self.commit_latency_label.pack(side='left', padx=10)
+        
+        self.last_sale_label = tk.Label(status_frame, text="", font=('Arial', 9),
+                                       bg='#bdc3c7', fg='#2c3e50')
+        self.last_sale_label.pack(side='right', padx=10)
     
     def create_menu(self):
         menubar = tk.Menu(self.root)
@@ -65,6 +107,14 @@ class POSMain:
             users_menu = tk.Menu(menubar, tearoff=0)
             menubar.add_cascade(label="Usuarios", menu=users_menu)
             users_menu.add_command(label="Gestión de Usuarios", command=self.manage_users, accelerator="F4")
+            
+            # Menú Diagnóstico: perfilador de consultas SQL
+            diagnostics_menu = tk.Menu(menubar, tearoff=0)
+            menubar.add_cascade(label="Diagnóstico", menu=diagnostics_menu)
+            self.profiler_var = tk.BooleanVar(value=self.db.profiler.enabled)
+            diagnostics_menu.add_checkbutton(label="Perfilar Consultas SQL", variable=self.profiler_var,
+                                             command=self.toggle_query_profiler)
+            diagnostics_menu.add_command(label="Estadísticas de Consultas", command=self.show_query_stats)
         
         # Menú Reportes
         reports_menu = tk.Menu(menubar, tearoff=0)
@@ -103,28 +153,13 @@ class POSMain:
         tk.Button(search_frame, text="Buscar", command=self.search_products,
                  bg='#3498db', fg='white', relief='flat', padx=15).grid(row=0, column=2)
         
-        # Lista de productos
-        columns = ('Código', 'Nombre', 'Precio', 'Stock')
-        self.products_tree = ttk.Treeview(products_frame, columns=columns, show='headings', height=20)
-        
-        for col in columns:
-            self.products_tree.heading(col, text=col)
-            if col == 'Nombre':
-                self.products_tree.column(col, width=200)
-            else:
-                self.products_tree.column(col, width=100)
-        
-        # Scrollbar para productos
-        products_scrollbar = ttk.Scrollbar(products_frame, orient='vertical', 
-                                          command=self.products_tree.yview)
-        self.products_tree.configure(yscrollcommand=products_scrollbar.set)
-        
-        self.products_tree.grid(row=1, column=0, sticky='nsew')
-        products_scrollbar.grid(row=1, column=1, sticky='ns')
+        # Lista de productos (virtual: solo existen las filas visibles)
+        self.product_list = VirtualProductList(products_frame, height=20)
+        self.product_list.grid(row=1, column=0, sticky='nsew')
         
         # Bind doble click para agregar al carrito
-        self.products_tree.bind('<Double-1>', self.add_to_cart_from_list)
-        self.products_tree.bind('<Return>', self.add_to_cart_from_list)
+        self.product_list.bind('<Double-1>', self.add_to_cart_from_list)
+        self.product_list.bind('<Return>', self.add_to_cart_from_list)
     
     def create_cart_panel(self, parent):
         # Frame del carrito
@@ -233,139 +268,144 @@ class POSMain:
         self.root.bind('<F12>', lambda e: self.apply_discount())
     
     def load_products(self):
-        # Limpiar lista
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
-        
-        # Cargar productos
-        products = self.db.get_products()
-        for product in products:
-            self.products_tree.insert('', 'end', values=(
-                product[1],  # código
-                product[2],  # nombre
-                f"${product[5]:.2f}",  # precio
-                product[6]   # stock
-            ), tags=(product[0],))  # ID como tag
+        # El catálogo en memoria se lee de la base si no está cargado o si
+        # otra terminal cambió productos hace tiempo (catalog_outdated); la
+        # lista dibuja los productos visibles directamente desde él
+        if self.db.catalog_outdated():
+            self.db.get_products()
+        self.product_list.show(self.db.catalog.ordered_ids(), self.list_product)
+    
+    def list_product(self, producto_id):
+        # Resolver de la lista. Si el catálogo se invalidó (importación,
+        # cambio de categorías) get_product_by_id lo recarga y la lista se
+        # vuelve a armar con los ids nuevos en cuanto Tk quede libre
+        if not self.db.catalog.loaded:
+            self.root.after_idle(self.load_products)
+        return self.db.get_product_by_id(producto_id)
     
     def on_search_change(self, *args):
         # Búsqueda en tiempo real
-        search_term = self.search_var.get()
+        search_term = self.search_var.get().strip()
         if len(search_term) >= 2:
-            self.search_products()
+            self.live_search.schedule(search_term)
+        elif not search_term:
+            self.live_search.reset()
+            self.load_products()
+        else:
+            self.live_search.cancel()
     
     def search_products(self):
         search_term = self.search_var.get().strip()
         
-        # Limpiar lista
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
+        if not search_term:
+            self.live_search.reset()
+            self.load_products()
+            return
         
-        # Buscar productos
-        products = self.db.get_products(search_term)
-        for product in products:
-            self.products_tree.insert('', 'end', values=(
-                product[1],  # código
-                product[2],  # nombre
-                f"${product[5]:.2f}",  # precio
-                product[6]   # stock
-            ), tags=(product[0],))  # ID como tag
+        # Buscar sin esperar el intervalo entre teclas
+        self.live_search.start(search_term)
+    
+    def find_products(self, search_term):
+        # Se ejecuta en el hilo de búsqueda
+        return [Product._make(row) for row in self.db.get_products(search_term)]
+    
+    def show_search_results(self, search_term, products):
+        # El stock se lee del catálogo al dibujar, así refleja las ventas recientes
+        self.product_list.show(products, lambda product: self.db.catalog.by_id(product.id) or product)
     
     def quick_add_product(self, event=None):
         code = self.quick_code_var.get().strip()
         if not code:
             return
         
-        product = self.db.get_product_by_code(code)
-        if product:
-            if product[6] > 0:  # Verificar stock
-                self.add_to_cart(product[0], product[2], product[5], 1)
-                self.quick_code_var.set("")
-                self.quick_code_entry.focus()
-            else:
-                messagebox.showwarning("Sin Stock", f"El producto {product[2]} no tiene stock disponible")
-        else:
-            messagebox.showerror("Error", f"Producto con código {code} no encontrado")
+        try:
+            with self.tracer.span("escaneo", self.sale_trace, origen="código"):
+                item = self.checkout.add_by_code(code)
+        except ProductNotFound as e:
+            messagebox.showerror("Error", str(e))
+            return
+        except OutOfStock as e:
+            messagebox.showwarning("Sin Stock" if e.disponible <= 0 else "Stock Insuficiente", str(e))
+            return
+        
+        self.update_cart_row(item['producto_id'])
+        self.quick_code_var.set("")
+        self.quick_code_entry.focus()
     
     def add_to_cart_from_list(self, event=None):
-        selection = self.products_tree.selection()
-        if not selection:
+        product = self.product_list.selected()
+        if product is None:
             return
         
-        item = self.products_tree.item(selection[0])
-        product_id = item['tags'][0]
-        product_name = item['values'][1]
-        price = float(item['values'][2].replace('$', ''))
-        stock = int(item['values'][3])
-        
-        if stock > 0:
-            # Pedir cantidad
-            quantity = simpledialog.askinteger("Cantidad", 
-                                             f"Ingrese la cantidad para {product_name}:",
-                                             minvalue=1, maxvalue=stock)
-            if quantity:
-                self.add_to_cart(product_id, product_name, price, quantity)
-        else:
-            messagebox.showwarning("Sin Stock", f"El producto {product_name} no tiene stock disponible")
-    
-    def add_to_cart(self, product_id, product_name, price, quantity):
-        # Verificar si el producto ya está en el carrito
-        for i, item in enumerate(self.cart):
-            if item['producto_id'] == product_id:
-                # Actualizar cantidad
-                new_quantity = item['cantidad'] + quantity
-                # Verificar stock disponible
-                product = self.db.get_product_by_code(self.get_product_code_by_id(product_id))
-                if new_quantity <= product[6]:
-                    self.cart[i]['cantidad'] = new_quantity
-                    self.cart[i]['subtotal'] = new_quantity * price
-                    self.update_cart_display()
-                    return
+        # El stock se toma del catálogo, que ya descuenta las ventas en cola
+        stock = self.checkout.available_stock(product.id)
+        if stock <= 0:
+            messagebox.showwarning("Sin Stock", f"El producto {product.nombre} no tiene stock disponible")
+            return
+        
+        # Pedir cantidad
+        quantity = simpledialog.askinteger("Cantidad", 
+                                         f"Ingrese la cantidad para {product.nombre}:",
+                                         minvalue=1, maxvalue=stock)
+        if quantity:
+            self.add_to_cart(product.id, quantity)
+    
+    def add_to_cart(self, product_id, quantity):
+        try:
+            with self.tracer.span("escaneo", self.sale_trace, origen="lista"):
+                self.checkout.add_by_id(product_id, quantity)
+        except OutOfStock as e:
+            messagebox.showwarning("Stock Insuficiente", str(e))
+            return
+        except CheckoutError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        
+        self.update_cart_row(product_id)
+    
+    def update_cart_row(self, product_id):
+        # Redibuja solo la fila del producto (iid = producto_id) y los totales
+        with self.tracer.span("carrito", self.sale_trace, lineas=len(self.cart)):
+            iid = str(product_id)
+            item = self.cart.get(product_id)
+            if item is None:
+                if self.cart_tree.exists(iid):
+                    self.cart_tree.delete(iid)
+            else:
+                values = (
+                    item['nombre'],
+                    item['cantidad'],
+                    f"${item['precio']:.2f}",
+                    f"${item['subtotal']:.2f}"
+                )
+                if self.cart_tree.exists(iid):
+                    self.cart_tree.item(iid, values=values)
                 else:
-                    messagebox.showwarning("Stock Insuficiente", 
-                                         f"Stock disponible: {product[6]}, solicitado: {new_quantity}")
-                    return
-        
-        # Agregar nuevo item al carrito
-        self.cart.append({
-            'producto_id': product_id,
-            'nombre': product_name,
-            'precio': price,
-            'cantidad': quantity,
-            'subtotal': price * quantity
-        })
-        
-        self.update_cart_display()
-    
-    def get_product_code_by_id(self, product_id):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT codigo FROM productos WHERE id = ?", (product_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else None
+                    self.cart_tree.insert('', 'end', iid=iid, values=values)
+            
+            self.update_totals()
     
     def update_cart_display(self):
-        # Limpiar lista
-        for item in self.cart_tree.get_children():
-            self.cart_tree.delete(item)
-        
-        # Agregar items
-        for item in self.cart:
-            self.cart_tree.insert('', 'end', values=(
-                item['nombre'],
-                item['cantidad'],
-                f"${item['precio']:.2f}",
-                f"${item['subtotal']:.2f}"
-            ))
-        
-        # Actualizar totales
-        subtotal = sum(item['subtotal'] for item in self.cart)
-        discount = getattr(self, 'discount_amount', 0)
-        total = subtotal - discount
-        
-        self.subtotal_label.config(text=f"${subtotal:.2f}")
-        self.discount_label.config(text=f"${discount:.2f}")
-        self.total_label.config(text=f"${total:.2f}")
+        # Redibujo completo (al vaciar el carrito)
+        with self.tracer.span("carrito", self.sale_trace, lineas=len(self.cart), completo=True):
+            self.cart_tree.delete(*self.cart_tree.get_children())
+            
+            # Agregar items
+            for item in self.cart:
+                self.cart_tree.insert('', 'end', iid=str(item['producto_id']), values=(
+                    item['nombre'],
+                    item['cantidad'],
+                    f"${item['precio']:.2f}",
+                    f"${item['subtotal']:.2f}"
+                ))
+            
+            self.update_totals()
+    
+    def update_totals(self):
+        # Totales mantenidos por el carrito, sin volver a sumar las líneas
+        self.subtotal_label.config(text=f"${self.cart.subtotal:.2f}")
+        self.discount_label.config(text=f"${self.cart.discount:.2f}")
+        self.total_label.config(text=f"${self.cart.total:.2f}")
     
     def remove_from_cart(self):
         selection = self.cart_tree.selection()
@@ -373,29 +413,34 @@ class POSMain:
             messagebox.showwarning("Advertencia", "Seleccione un item para eliminar")
             return
         
-        index = self.cart_tree.index(selection[0])
-        del self.cart[index]
-        self.update_cart_display()
+        product_id = int(selection[0])
+        self.checkout.remove(product_id)
+        self.update_cart_row(product_id)
     
     def clear_cart(self):
         if self.cart and messagebox.askyesno("Confirmar", "¿Está seguro de limpiar el carrito?"):
-            self.cart = []
-            self.discount_amount = 0
+            self.checkout.clear()
             self.update_cart_display()
+            # El carrito descartado no es una venta: la próxima empieza otra traza
+            self.sale_trace = self.tracer.new_trace()
     
     def apply_discount(self):
         if not self.cart:
             messagebox.showwarning("Advertencia", "El carrito está vacío")
             return
         
-        subtotal = sum(item['subtotal'] for item in self.cart)
+        subtotal = self.cart.subtotal
         discount = simpledialog.askfloat("Descuento", 
                                        f"Subtotal: ${subtotal:.2f}\nIngrese el descuento:",
                                        minvalue=0, maxvalue=subtotal)
         
         if discount is not None:
-            self.discount_amount = discount
-            self.update_cart_display()
+            try:
+                self.checkout.apply_discount(discount)
+            except CheckoutError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            self.update_totals()
     
     def process_sale(self):
         if not self.cart:
@@ -403,37 +448,63 @@ class POSMain:
             return
         
         # Confirmar venta
-        subtotal = sum(item['subtotal'] for item in self.cart)
-        discount = getattr(self, 'discount_amount', 0)
-        total = subtotal - discount
+        subtotal = self.cart.subtotal
+        discount = self.cart.discount
+        total = self.cart.total
         
         if messagebox.askyesno("Confirmar Venta", 
                               f"Subtotal: ${subtotal:.2f}\nDescuento: ${discount:.2f}\nTotal: ${total:.2f}\n\n¿Procesar la venta?"):
             try:
-                # Procesar venta en la base de datos
-                numero_factura, total_final = self.db.create_sale(
-                    self.user['id'], 
-                    self.cart, 
-                    discount, 
-                    0  # impuesto
-                )
-                
-                # Mostrar factura
-                self.show_invoice(numero_factura, total_final)
-                
-                # Limpiar carrito
-                self.cart = []
-                self.discount_amount = 0
-                self.update_cart_display()
-                
-                messagebox.showinfo("Éxito", f"Venta procesada correctamente\nFactura: {numero_factura}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al procesar la venta: {str(e)}")
-    
-    def show_invoice(self, numero_factura, total):
+                # Encolar la venta; el hilo escritor la registra en la base
+                with self.tracer.span("cobro", self.sale_trace, lineas=len(self.cart)):
+                    receipt = self.checkout.checkout(trace_id=self.sale_trace)
+            except EmptyCart as e:
+                messagebox.showwarning("Advertencia", str(e))
+                return
+            except CheckoutError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            
+            # Mostrar factura sin esperar al registro; el número llega después
+            with self.tracer.span("factura", self.sale_trace):
+                self.pending_invoices[receipt.uid] = self.show_invoice(receipt)
+            
+            # El servicio deja un carrito nuevo para la siguiente venta
+            self.update_cart_display()
+            self.update_sales_status()
+            self.sale_trace = self.tracer.new_trace()
+            
+            # Las filas visibles muestran el stock ya reservado
+            self.product_list.render()
+    
+    def poll_sales_writer(self):
+        # Resultados del hilo escritor, recogidos en el hilo de Tk
+        for uid, numero_factura, total, error in self.sales_writer.poll():
+            invoice_number_var = self.pending_invoices.pop(uid, None)
+            if error is None:
+                if invoice_number_var is not None:
+                    invoice_number_var.set(f"Número: {numero_factura}")
+                self.last_sale_label.config(text=f"Venta registrada: {numero_factura}")
+            else:
+                if invoice_number_var is not None:
+                    invoice_number_var.set("Número: VENTA NO REGISTRADA")
+                messagebox.showerror("Error", f"Error al registrar la venta: {str(error)}")
+        
+        self.update_sales_status()
+        self.root.after(100, self.poll_sales_writer)
+    
+    def update_sales_status(self):
+        self.sales_queue_label.config(text=f"Ventas en cola: {self.sales_writer.pending}")
+        if self.sales_writer.last_commit_ms is not None:
+            self.commit_latency_label.config(
+                text=f"Último registro: {self.sales_writer.last_commit_ms:.0f} ms")
+    
+    def show_invoice(self, receipt):
+        # Si la venta aún se está registrando (numero_factura None) devuelve
+        # la variable donde escribir el número definitivo
+        numero_factura = receipt.numero_factura
         invoice_window = tk.Toplevel(self.root)
-        invoice_window.title(f"Factura {numero_factura}")
+        invoice_window.title("Factura" if numero_factura is None else f"Factura {numero_factura}")
         invoice_window.geometry("500x600")
         invoice_window.configure(bg='white')
         
@@ -445,7 +516,9 @@ class POSMain:
         tk.Label(invoice_frame, text="FACTURA DE VENTA", 
                 font=('Arial', 16, 'bold'), bg='white').pack(pady=(0, 10))
         
-        tk.Label(invoice_frame, text=f"Número: {numero_factura}", 
+        invoice_number_var = tk.StringVar(
+            value="Número: registrando..." if numero_factura is None else f"Número: {numero_factura}")
+        tk.Label(invoice_frame, textvariable=invoice_number_var, 
                 font=('Arial', 10), bg='white').pack(anchor='w')
         
         tk.Label(invoice_frame, text=f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", 
@@ -457,7 +530,7 @@ class POSMain:
         tk.Label(invoice_frame, text="-" * 50, bg='white').pack(pady=10)
         
         # Detalles de productos
-        for item in self.cart:
+        for item in receipt.items:
             item_text = f"{item['nombre']} x{item['cantidad']} = ${item['subtotal']:.2f}"
             tk.Label(invoice_frame, text=item_text, 
                     font=('Arial', 9), bg='white').pack(anchor='w')
@@ -465,8 +538,9 @@ class POSMain:
         tk.Label(invoice_frame, text="-" * 50, bg='white').pack(pady=10)
         
         # Totales
-        subtotal = sum(item['subtotal'] for item in self.cart)
-        discount = getattr(self, 'discount_amount', 0)
+        subtotal = receipt.subtotal
+        discount = receipt.descuento
+        total = receipt.total
         
         tk.Label(invoice_frame, text=f"Subtotal: ${subtotal:.2f}", 
                 font=('Arial', 10), bg='white').pack(anchor='e')
@@ -487,6 +561,8 @@ class POSMain:
         
         tk.Button(button_frame, text="Cerrar", command=invoice_window.destroy,
                  bg='#95a5a6', fg='white', relief='flat', padx=20).pack(side='left')
+        
+        return invoice_number_var
     
     def show_cart_context_menu(self, event):
         # Menú contextual para el carrito
@@ -503,6 +579,8 @@ class POSMain:
     def new_sale(self):
         self.clear_cart()
         self.search_var.set("")
+        # La lista muestra el catálogo en memoria; se recarga si otras
+        # terminales lo dejaron desactualizado
         self.load_products()
         self.quick_code_entry.focus()
     
@@ -516,21 +594,74 @@ class POSMain:
         messagebox.showinfo("Imprimir", "Funcionalidad de impresión en desarrollo")
     
     def manage_products(self):
+        from inventory_management import ProductManagement
         ProductManagement(self.root, self.db, self.user)
     
     def manage_inventory(self):
+        from inventory_management import ProductManagement
         ProductManagement(self.root, self.db, self.user)
     
     def manage_users(self):
         if self.user['rol'] == 'admin':
+            from login import UserManagement
             UserManagement(self.root, self.db)
         else:
             messagebox.showwarning("Acceso Denegado", "Solo los administradores pueden gestionar usuarios")
     
+    def toggle_query_profiler(self):
+        if self.profiler_var.get():
+            self.db.profiler.enable()
+        else:
+            self.db.profiler.disable()
+    
+    def show_query_stats(self):
+        stats_window = tk.Toplevel(self.root)
+        stats_window.title("Estadísticas de Consultas SQL")
+        stats_window.geometry("1000x500")
+        stats_window.configure(bg='#f0f0f0')
+        
+        profiler = self.db.profiler
+        tk.Label(stats_window,
+                text=f"Consultas de más de {profiler.slow_ms} ms: {profiler.log_path}",
+                font=('Arial', 10), bg='#f0f0f0').pack(anchor='w', padx=10, pady=(10, 0))
+        
+        text_frame = tk.Frame(stats_window)
+        text_frame.pack(expand=True, fill='both', padx=10, pady=10)
+        stats_text = tk.Text(text_frame, font=('Courier', 9), wrap='none')
+        x_scrollbar = ttk.Scrollbar(text_frame, orient='horizontal', command=stats_text.xview)
+        y_scrollbar = ttk.Scrollbar(text_frame, orient='vertical', command=stats_text.yview)
+        stats_text.configure(xscrollcommand=x_scrollbar.set, yscrollcommand=y_scrollbar.set)
+        y_scrollbar.pack(side='right', fill='y')
+        x_scrollbar.pack(side='bottom', fill='x')
+        stats_text.pack(expand=True, fill='both')
+        
+        def refresh():
+            stats_text.configure(state='normal')
+            stats_text.delete('1.0', 'end')
+            if not profiler.enabled:
+                stats_text.insert('end', "El perfilador está desactivado (Diagnóstico > Perfilar Consultas SQL)\n\n")
+            stats_text.insert('end', profiler.report())
+            stats_text.configure(state='disabled')
+        
+        def reset():
+            profiler.reset()
+            refresh()
+        
+        buttons_frame = tk.Frame(stats_window, bg='#f0f0f0')
+        buttons_frame.pack(pady=(0, 10))
+        tk.Button(buttons_frame, text="Actualizar", command=refresh,
+                 bg='#3498db', fg='white', relief='flat', padx=15).pack(side='left', padx=5)
+        tk.Button(buttons_frame, text="Reiniciar", command=reset,
+                 bg='#e67e22', fg='white', relief='flat', padx=15).pack(side='left', padx=5)
+        
+        refresh()
+    
     def daily_sales_report(self):
+        from reports import Reports
         Reports(self.root, self.db, self.user)
     
     def low_stock_report(self):
+        from reports import Reports
         Reports(self.root, self.db, self.user)
     
     def show_shortcuts(self):
@@ -586,3 +717,8 @@ class POSMain:
     
     def run(self):
         self.root.mainloop()
+        self.live_search.close()
+        # Confirmar las ventas que aún estén en cola antes de cerrar la base
+        self.sales_writer.stop()
+        if self.owns_db:
+            self.db.close()
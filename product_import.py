@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importación masiva de productos desde CSV o JSON
+
+Lee el archivo en streaming (nunca completo en memoria) y hace upsert por
+código en lotes, cada lote en su propia transacción. Columnas reconocidas:
+codigo, nombre, descripcion, categoria, precio_venta, precio_compra, stock,
+stock_minimo y activo; solo codigo, nombre y precio_venta son obligatorias.
+
+Formatos: .csv (con encabezado), .jsonl / .ndjson (un objeto por línea) y
+.json (un arreglo de objetos).
+
+Uso:
+    python product_import.py archivo.csv [--db pos_system.db] [--batch 1000]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+# Los productos existentes conservan su stock: el stock del archivo solo se
+# usa al crear el producto (los cambios de stock van por movimientos). Las
+# columnas opcionales ausentes en el archivo no pisan los valores existentes.
+UPSERT_SQL = '''
+    INSERT INTO productos (codigo, nombre, descripcion, categoria_id, precio_venta,
+                           precio_compra, stock, stock_minimo, activo)
+    VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, 0), COALESCE(?, 0), COALESCE(?, 1))
+    ON CONFLICT (codigo) DO UPDATE SET
+        nombre = excluded.nombre,
+        descripcion = COALESCE(excluded.descripcion, descripcion),
+        categoria_id = COALESCE(excluded.categoria_id, categoria_id),
+        precio_venta = excluded.precio_venta,
+        precio_compra = COALESCE(excluded.precio_compra, precio_compra),
+        stock_minimo = COALESCE(?, stock_minimo),
+        activo = COALESCE(?, activo)
+'''
+
+def iter_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+def iter_json_lines(path):
+    with open(path, encoding='utf-8-sig') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_json_array(path, chunk_size=65536):
+    # Decodifica un arreglo JSON elemento por elemento leyendo por bloques
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8-sig') as f:
+        buffer = ""
+        started = False
+        eof = False
+        while True:
+            buffer = buffer.lstrip()
+            if not started and buffer:
+                if buffer[0] != '[':
+                    raise ValueError("El archivo JSON debe contener un arreglo de productos")
+                buffer = buffer[1:].lstrip()
+                started = True
+            if started and buffer.startswith(','):
+                buffer = buffer[1:].lstrip()
+            if started and buffer.startswith(']'):
+                return
+
+            if started and buffer:
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield item
+                    buffer = buffer[end:]
+                    continue
+
+            if eof:
+                raise ValueError("Arreglo JSON incompleto")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+
+def iter_products(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return iter_csv(path)
+    if extension in ('.jsonl', '.ndjson'):
+        return iter_json_lines(path)
+    if extension == '.json':
+        return iter_json_array(path)
+    raise ValueError(f"Formato no soportado: {extension}")
+
+def _text(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _number(value, convert):
+    value = _text(value)
+    return None if value is None else convert(value)
+
+def parse_product(record):
+    # Normaliza un registro del archivo; ValueError si no es válido
+    codigo = _text(record.get('codigo'))
+    nombre = _text(record.get('nombre'))
+    if not codigo or not nombre:
+        raise ValueError("codigo y nombre son obligatorios")
+
+    precio_venta = _number(record.get('precio_venta'), float)
+    if precio_venta is None:
+        raise ValueError("precio_venta es obligatorio")
+
+    activo = _text(record.get('activo'))
+    if activo is not None:
+        activo = 0 if activo.lower() in ('0', 'no', 'false', 'inactivo') else 1
+    return (codigo, nombre, _text(record.get('descripcion')), _text(record.get('categoria')),
+            precio_venta,
+            _number(record.get('precio_compra'), float),
+            _number(record.get('stock'), lambda v: int(float(v))),
+            _number(record.get('stock_minimo'), lambda v: int(float(v))),
+            activo)
+
+class ProductImporter:
+    def __init__(self, db, batch_size=1000, progress=None):
+        self.db = db
+        self.batch_size = batch_size
+        # progress(procesados, importados, errores, segundos) tras cada lote
+        self.progress = progress
+        self.categories = {}
+        self.processed = 0
+        self.imported = 0
+        self.errors = []
+
+    def load_categories(self):
+        cursor = self.db.get_connection().execute("SELECT id, nombre FROM categorias")
+        self.categories = {nombre.casefold(): category_id for category_id, nombre in cursor}
+
+    def category_id(self, conn, nombre):
+        # Las categorías desconocidas se crean dentro de la transacción del lote
+        if nombre is None:
+            return None
+        key = nombre.casefold()
+        if key not in self.categories:
+            cursor = conn.execute("INSERT INTO categorias (nombre) VALUES (?)", (nombre,))
+            self.categories[key] = cursor.lastrowid
+        return self.categories[key]
+
+    def run(self, path):
+        self.load_categories()
+        start = time.perf_counter()
+        batch = []
+
+        for line_number, record in enumerate(iter_products(path), start=1):
+            self.processed += 1
+            try:
+                batch.append(parse_product(record))
+            except (ValueError, TypeError, AttributeError) as e:
+                self.errors.append((line_number, str(e)))
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                batch = []
+                self.report(start)
+
+        if batch:
+            self.write_batch(batch)
+        self.report(start)
+
+        # El catálogo en memoria del POS se recarga con los cambios
+        self.db.invalidate_catalog()
+        return time.perf_counter() - start
+
+    def write_batch(self, batch):
+        categories_before = dict(self.categories)
+        try:
+            with self.db.transaction(immediate=True) as conn:
+                rows = [(codigo, nombre, descripcion, self.category_id(conn, categoria),
+                         precio_venta, precio_compra, stock, stock_minimo, activo,
+                         stock_minimo, activo)
+                        for (codigo, nombre, descripcion, categoria, precio_venta,
+                             precio_compra, stock, stock_minimo, activo) in batch]
+                conn.executemany(UPSERT_SQL, rows)
+        except Exception:
+            # Las categorías creadas en el lote revertido no existen
+            self.categories = categories_before
+            raise
+        self.imported += len(batch)
+
+    def report(self, start):
+        if self.progress:
+            self.progress(self.processed, self.imported, len(self.errors), time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Importación masiva de productos")
+    parser.add_argument('archivo', help="archivo .csv, .json, .jsonl o .ndjson")
+    parser.add_argument('--db', default="pos_system.db", help="base de datos del POS")
+    parser.add_argument('--batch', type=int, default=1000, help="productos por transacción")
+    args = parser.parse_args()
+
+    from database import Database
+
+    def progress(processed, imported, errors, seconds):
+        rate = processed / seconds if seconds > 0 else 0
+        print(f"\r{processed} leídos, {imported} importados, {errors} con error "
+              f"({rate:.0f} productos/s)", end="", flush=True)
+
+    with Database(args.db) as db:
+        importer = ProductImporter(db, args.batch, progress)
+        seconds = importer.run(args.archivo)
+
+    print()
+    for line_number, message in importer.errors[:20]:
+        print(f"  registro {line_number}: {message}")
+    if len(importer.errors) > 20:
+        print(f"  ... y {len(importer.errors) - 20} errores más")
+    print(f"Importación terminada en {seconds:.1f} s")
+    sys.exit(1 if importer.errors else 0)
+
+if __name__ == "__main__":
+    main()
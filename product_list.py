@@ -0,0 +1,166 @@
+import tkinter as tk
+from tkinter import ttk
+
+class VirtualProductList:
+    """Lista de productos virtual para la ventana principal del POS.
+
+    El Treeview solo contiene las filas visibles; al desplazarse se vuelven a
+    llenar con los productos de la posición actual. Mostrar el catálogo
+    completo cuesta lo mismo con cien productos que con cien mil.
+    """
+
+    COLUMNS = ('Código', 'Nombre', 'Precio', 'Stock')
+    ROW_HEIGHT = 20
+
+    def __init__(self, parent, height=20):
+        self.frame = tk.Frame(parent, bg='#ecf0f1')
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self.frame, columns=self.COLUMNS, show='headings',
+                                 height=height, selectmode='browse')
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col)
+            if col == 'Nombre':
+                self.tree.column(col, width=200)
+            else:
+                self.tree.column(col, width=100)
+
+        # La barra no sigue al Treeview sino a la posición en la lista completa
+        self.scrollbar = ttk.Scrollbar(self.frame, orient='vertical', command=self.on_scrollbar)
+
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+
+        # rows: secuencia de productos o de ids; resolve convierte cada
+        # elemento en Product al dibujarlo (p. ej. catalog.by_id)
+        self.rows = []
+        self.resolve = None
+        self.offset = 0
+        self.visible = height
+        self.selected_index = None
+        # iid de cada fila dibujada -> posición en rows
+        self.row_index = {}
+
+        style_height = ttk.Style().lookup('Treeview', 'rowheight')
+        self.row_height = int(style_height) if style_height else self.ROW_HEIGHT
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<Up>', lambda e: self.move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self.move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self.move_selection(-self.visible))
+        self.tree.bind('<Next>', lambda e: self.move_selection(self.visible))
+        self.tree.bind('<Home>', lambda e: self.move_selection(-len(self.rows)))
+        self.tree.bind('<End>', lambda e: self.move_selection(len(self.rows)))
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def bind(self, sequence, func):
+        self.tree.bind(sequence, func)
+
+    def show(self, rows, resolve=None):
+        # Reemplaza el contenido sin copiar rows y vuelve al principio
+        self.rows = rows
+        self.resolve = resolve
+        self.offset = 0
+        self.selected_index = None
+        self.render()
+
+    def product_at(self, index):
+        row = self.rows[index]
+        return self.resolve(row) if self.resolve else row
+
+    def selected(self):
+        if self.selected_index is None or self.selected_index >= len(self.rows):
+            return None
+        return self.product_at(self.selected_index)
+
+    def render(self):
+        # Vuelve a llenar solo las filas visibles (también refresca precios y stock)
+        count = max(0, min(self.visible, len(self.rows) - self.offset))
+        items = self.tree.get_children()
+        if len(items) > count:
+            self.tree.delete(*items[count:])
+            items = items[:count]
+
+        self.row_index = {}
+        selected_iid = None
+        for position in range(count):
+            index = self.offset + position
+            product = self.product_at(index)
+            values = ("", "", "", "") if product is None else (
+                product.codigo, product.nombre, f"${product.precio_venta:.2f}", product.stock)
+
+            if position < len(items):
+                iid = items[position]
+                self.tree.item(iid, values=values)
+            else:
+                iid = self.tree.insert('', 'end', values=values)
+            self.row_index[iid] = index
+            if index == self.selected_index:
+                selected_iid = iid
+
+        if selected_iid is not None:
+            self.tree.selection_set(selected_iid)
+            self.tree.focus(selected_iid)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        total = len(self.rows)
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + count) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.rows) - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+        return 'break'
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(value) * len(self.rows)))
+        elif action == 'scroll':
+            step = self.visible if unit == 'pages' else 1
+            self.scroll(int(value) * step)
+
+    def on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_resize(self, event):
+        # Filas que caben en el alto actual, sin contar el encabezado
+        visible = max(1, event.height // self.row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.offset = max(0, min(self.offset, len(self.rows) - self.visible))
+            self.render()
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.row_index:
+            self.selected_index = self.row_index[selection[0]]
+
+    def move_selection(self, step):
+        if not self.rows:
+            return 'break'
+
+        current = self.offset if self.selected_index is None else self.selected_index
+        self.selected_index = max(0, min(current + step, len(self.rows) - 1))
+
+        # Desplazar lo justo para que la selección quede visible
+        if self.selected_index < self.offset:
+            self.offset = self.selected_index
+        elif self.selected_index >= self.offset + self.visible:
+            self.offset = self.selected_index - self.visible + 1
+        self.render()
+        return 'break'
@@ -0,0 +1,246 @@
+"""
+Perfilador de consultas SQL, activable en tiempo de ejecución
+
+Database abre todas sus conexiones con ProfiledConnection. Mientras el
+perfilador está desactivado cada sentencia pasa directo a sqlite3; al
+activarlo (menú Diagnóstico del administrador) se mide cada sentencia y se
+acumula por sentencia normalizada (literales y listas IN reemplazados por ?):
+cantidad de llamadas, tiempo total, máximo e histograma de latencias.
+
+El tiempo de una consulta incluye la primera lectura de resultados
+(fetchone / fetchmany / fetchall), que es donde SQLite hace la mayor parte
+del trabajo de un SELECT. Las sentencias que superan slow_ms se escriben en
+un log rotativo junto con su EXPLAIN QUERY PLAN (sin los parámetros, que
+pueden contener datos de usuarios).
+"""
+
+import bisect
+import re
+import sqlite3
+import threading
+import time
+
+# Límites superiores (ms) de los intervalos del histograma; el último
+# intervalo no tiene límite
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+# Sentencias que admiten EXPLAIN QUERY PLAN con sentido
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+def normalize(sql):
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (?, ...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+class StatementStats:
+    __slots__ = ('sql', 'count', 'total_ms', 'max_ms', 'buckets')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, fraction):
+        # Límite superior del intervalo donde cae el percentil (el máximo
+        # observado si cae en el último intervalo)
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                return min(BUCKETS_MS[index], self.max_ms) if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+class QueryProfiler:
+    SLOW_MS = 100
+    LOG_PATH = "consultas_lentas.log"
+    LOG_MAX_BYTES = 1_000_000
+    LOG_BACKUPS = 5
+    # Tope de textos SQL distintos con la normalización guardada
+    NORMALIZED_CACHE_SIZE = 2000
+
+    def __init__(self, slow_ms=SLOW_MS, log_path=LOG_PATH):
+        self.enabled = False
+        self.slow_ms = slow_ms
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._normalized = {}
+        self._logger = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def statements(self):
+        # Copia de las estadísticas, de mayor a menor tiempo total
+        with self._lock:
+            stats = list(self._stats.values())
+        return sorted(stats, key=lambda s: s.total_ms, reverse=True)
+
+    def report(self, limit=30):
+        lines = [f"{'llamadas':>9} {'total ms':>10} {'prom ms':>8} {'p50':>7} {'p95':>7} "
+                 f"{'p99':>7} {'máx ms':>8}  sentencia"]
+        for stats in self.statements()[:limit]:
+            lines.append(f"{stats.count:>9} {stats.total_ms:>10.1f} {stats.total_ms / stats.count:>8.2f} "
+                         f"{stats.percentile(0.5):>7.2f} {stats.percentile(0.95):>7.2f} "
+                         f"{stats.percentile(0.99):>7.2f} {stats.max_ms:>8.2f}  {stats.sql[:160]}")
+        return "\n".join(lines)
+
+    def record(self, conn, sql, parameters, ms):
+        # parameters None: sentencia sin EXPLAIN (executemany, COMMIT)
+        key = self._normalized.get(sql)
+        if key is None:
+            if len(self._normalized) >= self.NORMALIZED_CACHE_SIZE:
+                self._normalized.clear()
+            key = self._normalized[sql] = normalize(sql)
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats(key)
+            stats.add(ms)
+
+        if ms >= self.slow_ms:
+            self._log_slow(conn, sql, parameters, ms)
+
+    def _log_slow(self, conn, sql, parameters, ms):
+        lines = [f"{ms:.1f} ms  {_SPACES.sub(' ', sql).strip()}"]
+        if parameters is not None and sql.lstrip().upper().startswith(_EXPLAINABLE):
+            try:
+                # Cursor base de sqlite3: el EXPLAIN no se mide a sí mismo
+                plan = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+                lines.extend(f"    {detail}" for _, _, _, detail in plan)
+            except sqlite3.Error as e:
+                lines.append(f"    (sin plan: {e})")
+        self._slow_logger().warning("\n".join(lines))
+
+    def _slow_logger(self):
+        # El módulo logging solo se carga si alguna vez hay consultas lentas
+        if self._logger is None:
+            import logging
+            import logging.handlers
+
+            handler = logging.handlers.RotatingFileHandler(
+                self.log_path, maxBytes=self.LOG_MAX_BYTES, backupCount=self.LOG_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger = logging.getLogger("pos.consultas_lentas")
+            logger.addHandler(handler)
+            logger.setLevel(logging.WARNING)
+            logger.propagate = False
+            self._logger = logger
+        return self._logger
+
+class ProfiledCursor(sqlite3.Cursor):
+    # Consulta medida cuyo tiempo todavía puede sumar la primera lectura:
+    # (perfilador, sql, parámetros, ms)
+    _pending = None
+
+    def execute(self, sql, parameters=()):
+        profiler = self.connection.profiler
+        if self._pending is not None:
+            self._flush()
+        if profiler is None or not profiler.enabled:
+            return super().execute(sql, parameters)
+
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._pending = (profiler, sql, parameters, (time.perf_counter() - start) * 1000)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        profiler = self.connection.profiler
+        if self._pending is not None:
+            self._flush()
+        if profiler is None or not profiler.enabled:
+            return super().executemany(sql, seq_of_parameters)
+
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        profiler.record(self.connection, sql, None, (time.perf_counter() - start) * 1000)
+        return self
+
+    def fetchone(self):
+        if self._pending is None:
+            return super().fetchone()
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._flush((time.perf_counter() - start) * 1000)
+        return row
+
+    def fetchmany(self, size=None):
+        if self._pending is None:
+            return super().fetchmany(self.arraysize if size is None else size)
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._flush((time.perf_counter() - start) * 1000)
+        return rows
+
+    def fetchall(self):
+        if self._pending is None:
+            return super().fetchall()
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._flush((time.perf_counter() - start) * 1000)
+        return rows
+
+    def _flush(self, fetch_ms=0.0):
+        profiler, sql, parameters, ms = self._pending
+        self._pending = None
+        profiler.record(self.connection, sql, parameters, ms + fetch_ms)
+
+    def __del__(self):
+        # Consultas que nunca se leyeron con fetch*
+        if self._pending is not None:
+            try:
+                self._flush()
+            except Exception:
+                pass
+
+class ProfiledConnection(sqlite3.Connection):
+    # Database asigna su perfilador al abrir la conexión
+    profiler = None
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    # Connection.execute de sqlite3 no pasa por Cursor.execute: con el
+    # perfilador activo se redirige al cursor propio para que se mida
+    def execute(self, sql, parameters=()):
+        if self.profiler is None or not self.profiler.enabled:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if self.profiler is None or not self.profiler.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        profiler = self.profiler
+        if profiler is None or not profiler.enabled:
+            return super().commit()
+
+        start = time.perf_counter()
+        super().commit()
+        profiler.record(self, "COMMIT", None, (time.perf_counter() - start) * 1000)
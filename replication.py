@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Envío del registro de replicación a la base central
+
+Cada venta y cada lote de movimientos de stock queda en la tabla replicacion
+en la misma transacción que los confirma, así que el local sigue vendiendo
+sin conexión. El enviador lee los registros posteriores al último aceptado
+por la central, los manda en lotes comprimidos (JSON con zlib) por HTTP a
+replication_server.py y avanza la secuencia 'replicacion' hasta el número
+que la central confirma. Si la central no responde, reintenta con espera
+creciente y retoma desde el último registro confirmado; la central descarta
+los registros que ya tiene, de modo que reenviar un lote no duplica nada.
+
+El registro empieza a llenarse cuando el enviador arranca por primera vez
+(Database.enable_replication); las terminales sin central no lo llenan.
+Los registros confirmados se borran pasados RETENTION_DAYS días (también
+con maintenance.py prune-replication).
+
+Si la central rechaza un lote (4xx) MAX_REJECTIONS veces seguidas, el
+enviador pasa a mandar de a un registro para encontrar el culpable, y el
+que se sigue rechazando se aparta a replicacion_rechazos para que no frene
+a los siguientes. Los errores se registran con logging y nunca detienen
+el hilo.
+
+Un proceso por archivo de base (no por terminal):
+    python replication.py --url http://central:8765 [--db pos_system.db] [--once]
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from http.client import HTTPException
+
+from database import Database
+
+logger = logging.getLogger("pos.replicacion")
+
+class ReplicationShipper:
+    # Registros por lote enviado
+    BATCH_SIZE = 500
+    # Espera entre consultas del registro cuando no hay nada que enviar (segundos)
+    INTERVAL = 2.0
+    # Espera máxima entre reintentos con la central caída (segundos)
+    MAX_RETRY_DELAY = 60.0
+    TIMEOUT = 15
+    # Días que se conservan los registros ya confirmados; la limpieza se
+    # hace como mucho una vez por PRUNE_INTERVAL segundos
+    RETENTION_DAYS = 30
+    PRUNE_INTERVAL = 3600
+    # Rechazos seguidos de un lote antes de aislar el registro culpable
+    MAX_REJECTIONS = 5
+
+    def __init__(self, db, url, batch_size=BATCH_SIZE, interval=INTERVAL):
+        self.db = db
+        self.url = url.rstrip('/') + "/replicacion"
+        self.batch_size = batch_size
+        self.interval = interval
+        self.nodo = None
+        self.shipped = 0
+        self.failures = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_prune = None
+        self._rejections = 0
+        # Enviando de a un registro para aislar uno que la central rechaza;
+        # cuenta los registros que faltan revisar
+        self._isolating = 0
+        self.set_aside = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="replication", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def pending(self):
+        # Registros todavía no confirmados por la central
+        return self.db.get_connection().execute('''
+            SELECT COUNT(*) FROM replicacion
+            WHERE seq > (SELECT valor FROM secuencias WHERE nombre = 'replicacion')
+        ''').fetchone()[0]
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop.is_set():
+            try:
+                more = self.ship_once()
+            except urllib.error.HTTPError as e:
+                self._record_failure(e)
+                if 400 <= e.code < 500:
+                    self._rejected(e)
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY)
+                continue
+            except Exception as e:
+                # Central caída, red cortada, respuesta inválida o base local
+                # bloqueada: se reintenta el mismo lote (urllib.error.URLError
+                # hereda de OSError)
+                self._record_failure(e)
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY)
+                continue
+
+            delay = self.interval
+            self.last_error = None
+            self._rejections = 0
+            if not more:
+                try:
+                    self._prune()
+                except Exception as e:
+                    self._record_failure(e)
+                self._stop.wait(self.interval)
+
+        self.db.release_connection()
+
+    def _record_failure(self, error):
+        self.failures += 1
+        # Un error que se repite se registra una sola vez
+        if str(error) != str(self.last_error):
+            if isinstance(error, (OSError, ValueError)) or self.db.is_busy_error(error):
+                logger.warning("No se pudo enviar a la central: %s", error)
+            else:
+                logger.error("Error en el envío a la central", exc_info=error)
+        self.last_error = error
+
+    def _rejected(self, error):
+        # La central rechaza el lote: primero se lo manda de a un registro;
+        # el registro que se sigue rechazando solo se aparta
+        self._rejections += 1
+        if self._rejections < self.MAX_REJECTIONS:
+            return
+        self._rejections = 0
+        if not self._isolating:
+            self._isolating = self.batch_size
+            return
+        self._set_aside(error)
+        self._isolating = 0
+
+    def _set_aside(self, error):
+        with self.db.transaction() as conn:
+            row = conn.execute('''
+                SELECT seq FROM replicacion
+                WHERE seq > (SELECT valor FROM secuencias WHERE nombre = 'replicacion')
+                ORDER BY seq LIMIT 1
+            ''').fetchone()
+            if row is None:
+                return
+            conn.execute('''
+                INSERT OR REPLACE INTO replicacion_rechazos (seq, tipo, datos, fecha, error)
+                SELECT seq, tipo, datos, fecha, ? FROM replicacion WHERE seq = ?
+            ''', (str(error), row[0]))
+            conn.execute("DELETE FROM replicacion WHERE seq = ?", row)
+        self.set_aside += 1
+        logger.error("Registro %s rechazado por la central, apartado en replicacion_rechazos", row[0])
+
+    def ship_once(self):
+        # Envía un lote; True si quedan registros para enviar enseguida
+        conn = self.db.get_connection()
+        if self.nodo is None:
+            self.db.enable_replication()
+            self.nodo = conn.execute("SELECT valor FROM configuracion WHERE clave = 'nodo'").fetchone()[0]
+
+        limit = 1 if self._isolating else self.batch_size
+        confirmed = conn.execute("SELECT valor FROM secuencias WHERE nombre = 'replicacion'").fetchone()[0]
+        rows = conn.execute('''
+            SELECT seq, tipo, fecha, datos FROM replicacion
+            WHERE seq > ? ORDER BY seq LIMIT ?
+        ''', (confirmed, limit)).fetchall()
+        if not rows:
+            self._isolating = 0
+            return False
+
+        # datos ya es JSON: se arma el cuerpo sin volver a decodificarlo
+        records = ",".join(f"[{seq},{json.dumps(tipo)},{json.dumps(fecha)},{datos}]"
+                           for seq, tipo, fecha, datos in rows)
+        body = zlib.compress(f'{{"nodo":{json.dumps(self.nodo)},"registros":[{records}]}}'.encode('utf-8'))
+        request = urllib.request.Request(self.url, data=body, method='POST', headers={
+            'Content-Type': 'application/json',
+            'Content-Encoding': 'deflate',
+        })
+        with urllib.request.urlopen(request, timeout=self.TIMEOUT) as response:
+            accepted = int(json.loads(response.read())['confirmado'])
+
+        # La central es la referencia: si restauró una copia anterior
+        # informa un número menor y se reenvía desde ahí
+        with self.db.transaction() as conn:
+            conn.execute("UPDATE secuencias SET valor = ? WHERE nombre = 'replicacion'", (accepted,))
+        self.shipped += max(0, accepted - confirmed)
+        if self._isolating:
+            # El lote rechazado pasó completo de a un registro
+            self._isolating -= 1
+        return len(rows) == limit or accepted < confirmed
+
+    def _prune(self):
+        now = time.monotonic()
+        if self._last_prune is not None and now - self._last_prune < self.PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        self.db.prune_replication_log(self.RETENTION_DAYS)
+
+def main():
+    parser = argparse.ArgumentParser(description="Envío de ventas y movimientos a la base central")
+    parser.add_argument('--url', required=True, help="dirección de replication_server.py")
+    parser.add_argument('--db', default="pos_system.db", help="archivo de la base del local")
+    parser.add_argument('--once', action='store_true', help="enviar lo pendiente y terminar")
+    args = parser.parse_args()
+
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s")
+    with Database(args.db) as db:
+        shipper = ReplicationShipper(db, args.url)
+        if args.once:
+            try:
+                while shipper.ship_once():
+                    pass
+            except (OSError, HTTPException, ValueError) as e:
+                print(f"No se pudo enviar a la central: {e}")
+                return 1
+            print(f"{shipper.shipped} registros enviados, {shipper.pending()} pendientes")
+            return 0
+
+        shipper.start()
+        try:
+            while True:
+                time.sleep(60)
+                status = f"error: {shipper.last_error}" if shipper.last_error else "ok"
+                print(f"{time.strftime('%H:%M:%S')} enviados {shipper.shipped}, "
+                      f"pendientes {shipper.pending()}, apartados {shipper.set_aside}, {status}", flush=True)
+        except KeyboardInterrupt:
+            shipper.stop()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Base central: recibe el registro de replicación de los locales
+
+Servidor HTTP que acepta los lotes enviados por replication.py y los guarda
+en su propia base SQLite (ventas, detalle y movimientos de todos los locales,
+identificados por el nodo de cada uno). Por cada nodo guarda el último
+número de registro aplicado: los registros repetidos de un lote reenviado se
+descartan, y cada lote se aplica en una única transacción junto con ese
+número, así que un corte a mitad de camino no deja lotes aplicados a medias.
+
+La descompresión y la lectura del JSON se hacen en el hilo de cada pedido;
+solo la escritura pasa por la conexión compartida, de a un lote por vez.
+
+    python replication_server.py [--db central.db] [--host 0.0.0.0] [--port 8765]
+
+GET /replicacion devuelve el estado de cada nodo.
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class CentralStore:
+    # Tamaño máximo aceptado de un lote, comprimido y sin comprimir
+    MAX_BODY_BYTES = 50_000_000
+
+    def __init__(self, db_name="central.db"):
+        self.db_name = db_name
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_name, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self._create_schema()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _create_schema(self):
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS nodos (
+                nodo TEXT PRIMARY KEY,
+                confirmado INTEGER NOT NULL DEFAULT 0,
+                registros INTEGER NOT NULL DEFAULT 0,
+                ultima_recepcion TIMESTAMP
+            );
+            CREATE TABLE IF NOT EXISTS ventas (
+                nodo TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                numero_factura TEXT NOT NULL,
+                uid TEXT,
+                usuario_id INTEGER,
+                total REAL NOT NULL,
+                descuento REAL DEFAULT 0,
+                impuesto REAL DEFAULT 0,
+                fecha TIMESTAMP,
+                PRIMARY KEY (nodo, numero_factura)
+            );
+            CREATE TABLE IF NOT EXISTS detalle_ventas (
+                nodo TEXT NOT NULL,
+                numero_factura TEXT NOT NULL,
+                producto_id INTEGER,
+                codigo TEXT,
+                cantidad INTEGER NOT NULL,
+                precio_unitario REAL NOT NULL,
+                subtotal REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS movimientos_inventario (
+                nodo TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                producto_id INTEGER,
+                codigo TEXT,
+                tipo_movimiento TEXT NOT NULL,
+                cantidad INTEGER NOT NULL,
+                motivo TEXT,
+                usuario_id INTEGER,
+                fecha TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha);
+            CREATE INDEX IF NOT EXISTS idx_detalle_ventas_factura ON detalle_ventas (nodo, numero_factura);
+            CREATE INDEX IF NOT EXISTS idx_detalle_ventas_codigo ON detalle_ventas (codigo);
+            CREATE INDEX IF NOT EXISTS idx_movimientos_codigo ON movimientos_inventario (codigo);
+        ''')
+
+    def confirmed(self, nodo):
+        row = self.conn.execute("SELECT confirmado FROM nodos WHERE nodo = ?", (nodo,)).fetchone()
+        return row[0] if row else 0
+
+    def apply(self, nodo, records):
+        # records: [seq, tipo, fecha, datos] en orden de seq. Devuelve el
+        # último número aplicado del nodo
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                last = self.confirmed(nodo)
+                records = [record for record in records if record[0] > last]
+                sales, details, movements = [], [], []
+                for seq, tipo, fecha, datos in records:
+                    if tipo == 'venta':
+                        sales.append((nodo, seq, datos['numero_factura'], datos['uid'], datos['usuario_id'],
+                                      datos['total'], datos['descuento'], datos['impuesto'], datos['fecha']))
+                        details.extend((nodo, datos['numero_factura'], item['producto_id'], item['codigo'],
+                                        item['cantidad'], item['precio'], item['subtotal'])
+                                       for item in datos['items'])
+                    elif tipo != 'movimientos':
+                        raise ValueError(f"Tipo de registro desconocido: {tipo}")
+                    movements.extend((nodo, seq, m['producto_id'], m['codigo'], m['tipo'], m['cantidad'],
+                                      m['motivo'], m['usuario_id'], m['fecha'])
+                                     for m in datos['movimientos'])
+
+                self.conn.executemany('''
+                    INSERT OR IGNORE INTO ventas (nodo, seq, numero_factura, uid, usuario_id,
+                                                  total, descuento, impuesto, fecha)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', sales)
+                self.conn.executemany('''
+                    INSERT INTO detalle_ventas (nodo, numero_factura, producto_id, codigo,
+                                                cantidad, precio_unitario, subtotal)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', details)
+                self.conn.executemany('''
+                    INSERT INTO movimientos_inventario (nodo, seq, producto_id, codigo, tipo_movimiento,
+                                                        cantidad, motivo, usuario_id, fecha)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', movements)
+
+                if records:
+                    last = records[-1][0]
+                self.conn.execute('''
+                    INSERT INTO nodos (nodo, confirmado, registros, ultima_recepcion)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT (nodo) DO UPDATE SET
+                        confirmado = excluded.confirmado,
+                        registros = registros + excluded.registros,
+                        ultima_recepcion = excluded.ultima_recepcion
+                ''', (nodo, last, len(records)))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            return last
+
+    def status(self):
+        with self._lock:
+            return [dict(zip(('nodo', 'confirmado', 'registros', 'ultima_recepcion'), row))
+                    for row in self.conn.execute(
+                        "SELECT nodo, confirmado, registros, ultima_recepcion FROM nodos ORDER BY nodo")]
+
+class ReplicationHandler(BaseHTTPRequestHandler):
+    # El servidor asigna el CentralStore compartido
+    store = None
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if self.path != "/replicacion":
+            return self._reply(404, {'error': "ruta desconocida"})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length > self.store.MAX_BODY_BYTES:
+                return self._reply(413, {'error': "lote demasiado grande"})
+            body = self.rfile.read(length)
+            if self.headers.get('Content-Encoding') == 'deflate':
+                decompressor = zlib.decompressobj()
+                body = decompressor.decompress(body, self.store.MAX_BODY_BYTES)
+                if decompressor.unconsumed_tail:
+                    return self._reply(413, {'error': "lote demasiado grande"})
+            batch = json.loads(body)
+            accepted = self.store.apply(str(batch['nodo']), batch['registros'])
+        except (ValueError, KeyError, TypeError, IndexError, zlib.error) as e:
+            return self._reply(400, {'error': f"lote inválido: {e}"})
+        except sqlite3.Error as e:
+            return self._reply(503, {'error': f"base central: {e}"})
+        self._reply(200, {'confirmado': accepted})
+
+    def do_GET(self):
+        if self.path != "/replicacion":
+            return self._reply(404, {'error': "ruta desconocida"})
+        self._reply(200, {'nodos': self.store.status()})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Decenas de locales envían cada pocos segundos: solo se registran errores
+        pass
+
+    def log_error(self, format, *args):
+        super().log_message(format, *args)
+
+def create_server(store, host="0.0.0.0", port=8765):
+    handler = type('Handler', (ReplicationHandler,), {'store': store})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Base central de ventas y movimientos de los locales")
+    parser.add_argument('--db', default="central.db", help="archivo de la base central")
+    parser.add_argument('--host', default="0.0.0.0")
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    store = CentralStore(args.db)
+    server = create_server(store, args.host, args.port)
+    print(f"Recibiendo en http://{args.host}:{args.port}/replicacion, base {args.db}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        store.close()
+
+if __name__ == "__main__":
+    main()
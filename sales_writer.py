@@ -0,0 +1,221 @@
+import json
+import os
+import queue
+import re
+import socket
+import threading
+import time
+import uuid
+
+from tracing import NULL_TRACER
+
+class SalesWriter:
+    """Registra las ventas en un hilo de fondo para no bloquear la interfaz.
+
+    Cada venta se guarda primero en un diario local (JSONL con fsync) y luego
+    se encola; el hilo escritor la confirma en la base en orden de llegada.
+    Las ventas que quedaron en el diario sin confirmar (cierre inesperado) se
+    vuelven a encolar al iniciar; el uid de cada venta evita duplicarlas.
+    Los resultados se recogen desde el hilo de Tk con poll().
+
+    Si otra terminal retiene la base más allá de los reintentos de
+    Database.transaction, la venta no se descarta: se vuelve a intentar con
+    espera creciente y sigue contando como pendiente. Con la cola vacía el
+    escritor aprovecha para hacer el checkpoint del WAL.
+
+    Las unidades de cada venta en cola quedan reservadas en el catálogo hasta
+    que se registra o falla. Al cerrar, stop() espera a que se confirme la
+    cola; una venta que sigue bloqueada queda en el diario para el próximo
+    arranque.
+
+    El diario es de cada terminal (por defecto el nombre del equipo; con
+    varias cajas en un mismo equipo, --terminal en main.py): al compactarlo o
+    releerlo al iniciar solo se tocan las ventas propias, aunque todas las
+    terminales compartan la carpeta de la base.
+    """
+
+    # Espera máxima entre reintentos de una venta bloqueada (segundos)
+    MAX_RETRY_DELAY = 2.0
+    # Intervalo mínimo entre checkpoints del WAL (segundos)
+    CHECKPOINT_INTERVAL = 30
+
+    def __init__(self, db, journal_path=None, tracer=NULL_TRACER, terminal=None):
+        self.db = db
+        self.tracer = tracer
+        # El nombre no cambia entre arranques: tras un cierre inesperado la
+        # misma terminal retoma sus ventas pendientes
+        terminal = re.sub(r'[^\w.-]', '_', terminal or socket.gethostname())
+        self.journal_path = journal_path or f"{os.path.splitext(db.db_name)[0]}_ventas_pendientes_{terminal}.jsonl"
+        self._queue = queue.Queue()
+        self._results = queue.Queue()
+        self._journal_lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self.pending = 0
+        self.last_commit_ms = None
+        self.retries = 0
+        self._last_checkpoint = time.monotonic()
+
+    def start(self):
+        pending = self._read_pending()
+        # Reescribir el diario solo con lo pendiente descarta líneas truncadas
+        with open(self.journal_path, 'w', encoding='utf-8') as journal:
+            for entry in pending:
+                journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+        for entry in pending:
+            self.pending += 1
+            self.db.catalog.reserve(self._quantities(entry))
+            self._queue.put(entry)
+
+        self._thread = threading.Thread(target=self._run, name="sales-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        # Espera a que se confirmen las ventas encoladas antes de salir: el
+        # llamador cierra la base después. Las que sigan bloqueadas ya no se
+        # reintentan y quedan en el diario
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, usuario_id, items, descuento=0, impuesto=0, trace_id=None):
+        entry = {
+            'tipo': 'venta',
+            'uid': uuid.uuid4().hex,
+            # Traza de la venta y momento de encolado (tiempo de espera en cola)
+            'traza': trace_id,
+            'encolada': time.time(),
+            'usuario_id': usuario_id,
+            'items': [{'producto_id': item['producto_id'], 'nombre': item['nombre'],
+                       'cantidad': item['cantidad'], 'precio': item['precio'],
+                       'subtotal': item['subtotal']} for item in items],
+            'descuento': descuento,
+            'impuesto': impuesto,
+        }
+        self._append_journal(entry, pending_delta=1)
+
+        # Reservar el stock en el catálogo hasta que la venta se confirme
+        self.db.catalog.reserve(self._quantities(entry))
+
+        self._queue.put(entry)
+        return entry['uid']
+
+    def poll(self):
+        # Resultados listos: (uid, numero_factura, total, error)
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                break
+
+            # Las ventas de un diario anterior no traen traza
+            trace_id = entry.get('traza')
+            queued = entry.get('encolada')
+            if queued is not None:
+                self.tracer.record("espera", trace_id, queued, (time.time() - queued) * 1000)
+
+            start = time.perf_counter()
+            result = self._commit(entry, trace_id)
+            if result is None:
+                # Cierre con la base bloqueada: esta venta y las que siguen
+                # en la cola se registran en el próximo arranque
+                break
+            self.last_commit_ms = (time.perf_counter() - start) * 1000
+
+            # Registrada, la salida ya está en el stock de la base; fallida,
+            # las unidades vuelven a estar disponibles
+            self.db.catalog.release(self._quantities(entry))
+
+            # Las ventas fallidas también salen del diario: el error se informa
+            # al cajero y no se reintenta en el próximo arranque
+            self._append_journal({'tipo': 'procesada', 'uid': entry['uid']}, pending_delta=-1)
+            self._results.put(result)
+
+            if self._queue.empty():
+                self._compact_journal()
+                self._checkpoint()
+
+        self.db.release_connection()
+
+    def _commit(self, entry, trace_id):
+        delay = self.db.BEGIN_BACKOFF
+        while True:
+            try:
+                with self.tracer.span("registro", trace_id, lineas=len(entry['items'])):
+                    numero_factura, total = self.db.create_sale(
+                        entry['usuario_id'], entry['items'],
+                        entry['descuento'], entry['impuesto'], uid=entry['uid'])
+                return (entry['uid'], numero_factura, total, None)
+            except Exception as e:
+                if not self.db.is_busy_error(e):
+                    return (entry['uid'], None, None, e)
+            # Base bloqueada por otra terminal: la venta sigue en el diario
+            # (el uid evita duplicarla) y se reintenta
+            if self._stopping.is_set():
+                return None
+            self.retries += 1
+            time.sleep(delay)
+            delay = min(delay * 2, self.MAX_RETRY_DELAY)
+
+    @staticmethod
+    def _quantities(entry):
+        return [(item['producto_id'], item['cantidad']) for item in entry['items']]
+
+    def _checkpoint(self):
+        if time.monotonic() - self._last_checkpoint < self.CHECKPOINT_INTERVAL:
+            return
+        self._last_checkpoint = time.monotonic()
+        try:
+            self.db.checkpoint()
+        except Exception:
+            # El checkpoint automático de SQLite sigue como respaldo
+            pass
+
+    def _append_journal(self, record, pending_delta):
+        # El contador de pendientes cambia junto con el diario para que la
+        # compactación nunca descarte una venta recién escrita
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._journal_lock:
+            self.pending += pending_delta
+            with open(self.journal_path, 'a', encoding='utf-8') as journal:
+                journal.write(line)
+                journal.flush()
+                os.fsync(journal.fileno())
+
+    def _compact_journal(self):
+        # Sin ventas pendientes el diario puede vaciarse
+        with self._journal_lock:
+            if self.pending == 0 and os.path.exists(self.journal_path):
+                open(self.journal_path, 'w').close()
+
+    def _read_pending(self):
+        if not os.path.exists(self.journal_path):
+            return []
+
+        sales = {}
+        with open(self.journal_path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Última línea incompleta por un corte de energía
+                    continue
+                if record['tipo'] == 'venta':
+                    sales[record['uid']] = record
+                else:
+                    sales.pop(record['uid'], None)
+        return list(sales.values())
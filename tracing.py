@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trazas de las etapas del proceso de venta
+
+Con --trace (main.py) cada etapa de una venta se registra como un span en un
+archivo JSONL, una línea por span:
+
+    {"trace": "...", "span": "escaneo", "inicio": 1760800000.123, "ms": 0.41, ...}
+
+Todos los spans de una misma venta comparten el id de traza, desde el primer
+escaneo hasta la factura y el registro en la base (hilo escritor). Etapas:
+escaneo (búsqueda por código), carrito (redibujo), cobro (cierre y encolado),
+espera (cola del hilo escritor), registro (create_sale) y factura (ventana).
+
+Sin archivo de trazas el tracer no hace nada y span() no reserva memoria.
+
+Resumen de un turno:
+    python tracing.py trazas.jsonl [--start "2026-01-31 08:00"] [--end "2026-01-31 16:00"]
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'trace_id', 'attrs', 'start', 'wall')
+
+    def __init__(self, tracer, name, trace_id, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ms = (time.perf_counter() - self.start) * 1000
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.trace_id, self.wall, ms, **self.attrs)
+        return False
+
+    def set(self, **attrs):
+        # Atributos que se conocen recién dentro de la etapa
+        self.attrs.update(attrs)
+
+class Tracer:
+    def __init__(self, path=None):
+        # path None: tracer desactivado
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    @property
+    def enabled(self):
+        return self._file is not None
+
+    def new_trace(self):
+        return uuid.uuid4().hex[:16] if self._file is not None else None
+
+    def span(self, name, trace_id=None, **attrs):
+        if self._file is None:
+            return _NULL_SPAN
+        return _Span(self, name, trace_id, attrs)
+
+    def record(self, name, trace_id, start, ms, **attrs):
+        # Span medido por el llamador: start en segundos de época, ms de duración
+        if self._file is None:
+            return
+        line = json.dumps({'trace': trace_id, 'span': name, 'inicio': round(start, 6),
+                           'ms': round(ms, 3), 'hilo': threading.current_thread().name, **attrs},
+                          ensure_ascii=False)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+# Tracer desactivado compartido (valor por defecto)
+NULL_TRACER = Tracer()
+
+def percentile(values, fraction):
+    # values ordenados; percentil por rango más cercano
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+def read_spans(path, start=None, end=None):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                span = json.loads(line)
+            except ValueError:
+                # Última línea incompleta si el proceso terminó de golpe
+                continue
+            if start is not None and span['inicio'] < start:
+                continue
+            if end is not None and span['inicio'] >= end:
+                continue
+            yield span
+
+# Etapas del hilo escritor: no hacen esperar al cajero
+BACKGROUND_STAGES = ('espera', 'registro')
+
+def summarize(spans):
+    # {etapa: duraciones ordenadas}, más el tiempo de cada venta que hizo
+    # esperar al cajero (suma de sus etapas en primer plano; no incluye el
+    # tiempo en que el cajero no opera el sistema)
+    stages = defaultdict(list)
+    per_trace = defaultdict(float)
+    for span in spans:
+        stages[span['span']].append(span['ms'])
+        if span.get('trace') and span['span'] not in BACKGROUND_STAGES:
+            per_trace[span['trace']] += span['ms']
+
+    if per_trace:
+        stages['venta completa'] = list(per_trace.values())
+    for values in stages.values():
+        values.sort()
+    return stages
+
+def parse_time(text):
+    return datetime.fromisoformat(text).timestamp() if text else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumen por etapa de las trazas de venta")
+    parser.add_argument('archivo', help="archivo JSONL generado con --trace")
+    parser.add_argument('--start', help="desde (YYYY-MM-DD HH:MM)")
+    parser.add_argument('--end', help="hasta (YYYY-MM-DD HH:MM)")
+    args = parser.parse_args()
+
+    stages = summarize(read_spans(args.archivo, parse_time(args.start), parse_time(args.end)))
+    if not stages:
+        print("No hay trazas en el período")
+        return
+
+    print(f"{'etapa':<16} {'cantidad':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'máx ms':>9}")
+    for name, values in sorted(stages.items(), key=lambda item: item[0] == 'venta completa'):
+        print(f"{name:<16} {len(values):>9} {percentile(values, 0.5):>9.2f} {percentile(values, 0.95):>9.2f} "
+              f"{percentile(values, 0.99):>9.2f} {values[-1]:>9.2f}")
+
+if __name__ == "__main__":
+    main()
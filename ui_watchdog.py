@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vigilancia de bloqueos del hilo de Tk
+
+Con --watchdog (main.py) la ventana principal programa un latido con after()
+cada INTERVAL_MS. Un hilo monitor revisa que los latidos lleguen a tiempo:
+si el bucle de eventos lleva más de THRESHOLD_MS sin atenderlos, la interfaz
+está congelada y el monitor toma muestras de la pila de Python del hilo
+principal (sys._current_frames) hasta que vuelve el latido. Cada bloqueo se
+escribe en un archivo JSONL con su duración, la pila más vista y el sitio
+del código del sistema que lo causó (el marco más interno de este proyecto).
+
+Ranking de los sitios que más bloquean:
+    python ui_watchdog.py bloqueos_ui.jsonl [--top 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, defaultdict
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def format_frame(frame_summary):
+    filename = os.path.relpath(frame_summary.filename, PROJECT_DIR) \
+        if frame_summary.filename.startswith(PROJECT_DIR) else frame_summary.filename
+    return f"{filename}:{frame_summary.lineno} {frame_summary.name}"
+
+def call_site(stack):
+    # Marco más interno que pertenece al sistema (no a tkinter ni a la
+    # biblioteca estándar): es la línea que hay que corregir
+    for frame_summary in reversed(stack):
+        if frame_summary.filename.startswith(PROJECT_DIR) and \
+                os.path.abspath(frame_summary.filename) != os.path.abspath(__file__):
+            return format_frame(frame_summary)
+    return format_frame(stack[-1]) if stack else "?"
+
+class UIWatchdog:
+    INTERVAL_MS = 100
+    THRESHOLD_MS = 200
+    # Pilas distintas guardadas por bloqueo como máximo
+    MAX_STACKS = 50
+
+    def __init__(self, root, path, threshold_ms=THRESHOLD_MS, interval_ms=INTERVAL_MS):
+        self.root = root
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self.stalls = 0
+        self._main_thread_id = threading.main_thread().ident
+        self._last_beat = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._last_beat = time.perf_counter()
+        self.root.after(self.interval_ms, self._beat)
+        self._thread = threading.Thread(target=self._monitor, name="ui-watchdog", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1)
+            self._thread = None
+
+    def _beat(self):
+        self._last_beat = time.perf_counter()
+        if not self._stop.is_set():
+            self.root.after(self.interval_ms, self._beat)
+
+    def _monitor(self):
+        # Revisa varias veces por umbral para muestrear la pila durante el bloqueo
+        check = min(self.interval_ms, self.threshold_ms) / 2000
+        with open(self.path, 'a', encoding='utf-8') as log:
+            while not self._stop.wait(check):
+                beat = self._last_beat
+                late_ms = (time.perf_counter() - beat) * 1000 - self.interval_ms
+                if late_ms < self.threshold_ms:
+                    continue
+
+                stall = self._follow_stall(beat, check)
+                if stall is not None:
+                    self.stalls += 1
+                    log.write(json.dumps(stall, ensure_ascii=False) + "\n")
+                    log.flush()
+
+    def _follow_stall(self, beat, check):
+        # Muestrea la pila del hilo principal hasta que llega el siguiente latido
+        started_wall = time.time() - (time.perf_counter() - beat) + self.interval_ms / 1000
+        stacks = Counter()
+        samples = {}
+        while self._last_beat == beat:
+            if self._stop.is_set():
+                return None
+            frame = sys._current_frames().get(self._main_thread_id)
+            if frame is not None:
+                stack = traceback.extract_stack(frame)
+                key = tuple(format_frame(f) for f in stack)
+                if key in stacks or len(stacks) < self.MAX_STACKS:
+                    stacks[key] += 1
+                    samples[key] = stack
+            # Sin referencias al marco del hilo principal entre muestras
+            frame = None
+            time.sleep(check)
+
+        duration_ms = (self._last_beat - beat) * 1000 - self.interval_ms
+        if not stacks:
+            return None
+        key = stacks.most_common(1)[0][0]
+        return {
+            'inicio': round(started_wall, 3),
+            'ms': round(duration_ms, 1),
+            'sitio': call_site(samples[key]),
+            'muestras': sum(stacks.values()),
+            'pila': list(key),
+        }
+
+def rank(path):
+    # {sitio: (bloqueos, ms totales, ms máximo)}
+    sites = defaultdict(lambda: [0, 0.0, 0.0])
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                stall = json.loads(line)
+            except ValueError:
+                continue
+            site = sites[stall['sitio']]
+            site[0] += 1
+            site[1] += stall['ms']
+            site[2] = max(site[2], stall['ms'])
+    return sorted(sites.items(), key=lambda item: item[1][1], reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sitios del código que más bloquean la interfaz")
+    parser.add_argument('archivo', help="archivo JSONL generado con --watchdog")
+    parser.add_argument('--top', type=int, default=20, help="cantidad de sitios a mostrar")
+    args = parser.parse_args()
+
+    sites = rank(args.archivo)
+    if not sites:
+        print("No hay bloqueos registrados")
+        return
+
+    print(f"{'bloqueos':>9} {'total ms':>10} {'máx ms':>9}  sitio")
+    for site, (count, total_ms, max_ms) in sites[:args.top]:
+        print(f"{count:>9} {total_ms:>10.0f} {max_ms:>9.0f}  {site}")
+
+if __name__ == "__main__":
+    main()